@@ -5,22 +5,50 @@ with support for batch operations and checkpointing
 """
 
 import os
-import shutil
 import sqlite3
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine, event, text
+from sqlalchemy import create_engine, event, insert, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
 
 try:
     from .models import Base
+    from .operations import clear_process_caches
 except ImportError:
     from models import Base
+    from operations import clear_process_caches
+
+class BatchSession:
+    """
+    Session wrapper for batch operations that adds chunked bulk inserts.
+
+    Behaves like the underlying Session for normal use; add_many() inserts
+    rows in executemany batches and, when a chunk_size is configured,
+    commits between chunks so peak memory stays bounded regardless of the
+    total row count (~1000 rows per chunk is the sweet spot).
+    """
+
+    def __init__(self, session: Session, chunk_size: int = 0):
+        self.session = session
+        self.chunk_size = chunk_size
+
+    def add_many(self, model, rows) -> None:
+        """Bulk-insert row dicts for a model, chunking when configured."""
+        chunk = self.chunk_size if self.chunk_size > 0 else len(rows)
+        for i in range(0, len(rows), max(chunk, 1)):
+            self.session.execute(insert(model), rows[i:i + chunk])
+            if self.chunk_size:
+                self.session.commit()
+
+    def __getattr__(self, name):
+        # Delegate everything else to the wrapped session
+        return getattr(self.session, name)
+
 
 class DatabaseManager:
     """Centralized database connection and session management"""
@@ -54,17 +82,32 @@ class DatabaseManager:
         """Create SQLAlchemy engine with SQLite optimizations"""
         database_url = f"sqlite:///{self.database_path}"
 
+        # WAL mode supports concurrent readers, but only if connections
+        # actually exist in parallel; StaticPool would serialize everything
+        # through one connection. In-memory databases still need StaticPool
+        # so all sessions share the same database.
+        if str(self.database_path) == ":memory:":
+            pool_kwargs = {"poolclass": StaticPool}
+        else:
+            # Pool sizing is env-tunable so simulation benchmarks can
+            # experiment without code changes
+            pool_kwargs = {
+                "poolclass": QueuePool,
+                "pool_size": int(os.environ.get("AGORA_POOL_SIZE", 8)),
+                "max_overflow": int(os.environ.get("AGORA_MAX_OVERFLOW", 16)),
+                "pool_timeout": int(os.environ.get("AGORA_POOL_TIMEOUT", 30)),
+            }
+
         engine = create_engine(
             database_url,
             echo=self.echo,
-            # SQLite optimizations for concurrent access
-            poolclass=StaticPool,
             connect_args={
                 "check_same_thread": False,
                 "timeout": 30,
             },
             pool_pre_ping=True,
-            pool_recycle=3600
+            pool_recycle=3600,
+            **pool_kwargs
         )
 
         # Register SQLite optimization pragmas
@@ -80,11 +123,14 @@ class DatabaseManager:
             if isinstance(dbapi_connection, sqlite3.Connection):
                 cursor = dbapi_connection.cursor()
                 # Performance optimizations
-                cursor.execute("PRAGMA journal_mode=WAL")      # Write-Ahead Logging for concurrency
-                cursor.execute("PRAGMA synchronous=NORMAL")    # Faster writes, still safe
-                cursor.execute("PRAGMA cache_size=10000")      # 10MB cache
-                cursor.execute("PRAGMA temp_store=MEMORY")     # Temp tables in memory
-                cursor.execute("PRAGMA mmap_size=268435456")   # 256MB memory-mapped I/O
+                cursor.execute("PRAGMA journal_mode=WAL")           # Write-Ahead Logging for concurrency
+                cursor.execute("PRAGMA synchronous=NORMAL")         # Faster writes, still safe under WAL
+                cursor.execute("PRAGMA cache_size=-65536")          # 64MB cache (negative = KB)
+                cursor.execute("PRAGMA temp_store=MEMORY")          # Temp tables in memory
+                cursor.execute("PRAGMA mmap_size=1073741824")       # 1GB memory-mapped I/O
+                cursor.execute("PRAGMA busy_timeout=5000")          # Wait on locks instead of failing
+                cursor.execute("PRAGMA wal_autocheckpoint=1000")    # Checkpoint every ~1000 pages
+                cursor.execute("PRAGMA journal_size_limit=67108864") # Cap WAL file at 64MB
                 # Foreign key enforcement
                 cursor.execute("PRAGMA foreign_keys=ON")
                 cursor.close()
@@ -92,12 +138,22 @@ class DatabaseManager:
     def initialize_database(self) -> None:
         """Create all tables and indexes."""
         Base.metadata.create_all(self.engine)
+        # Seed planner statistics so the partial indexes get picked early
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("ANALYZE")
         print(f"Database initialized: {self.database_path}")
 
     def reset_database(self) -> None:
         """Drop and recreate all tables. WARNING: Destroys all data!"""
-        Base.metadata.drop_all(self.engine)
-        Base.metadata.create_all(self.engines)
+        # Single transaction so a failed reset can't leave a half-dropped schema
+        with self.engine.begin() as conn:
+            Base.metadata.drop_all(conn)
+            Base.metadata.create_all(conn)
+        # Reclaim file space; VACUUM cannot run inside a transaction
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+        # Process-level caches still describe the dropped data
+        clear_process_caches()
         print(f"Database reset: {self.database_path}")
 
     @contextmanager
@@ -123,25 +179,28 @@ class DatabaseManager:
             session.close()
 
     @contextmanager
-    def batch_operation(self):
+    def batch_operation(self, chunk_size: int = 0):
         """
         Context manager for batch operations with explicit transaction control.
         Multiple operations must succeed or fail together.
 
+        Args:
+            chunk_size: If > 0, add_many() commits every chunk_size rows so
+                large inserts keep memory flat; 0 keeps a single transaction.
+
         Usage:
-            with db_manager.batch_operations() as session:
+            with db_manager.batch_operation(chunk_size=1000) as session:
                 # Multiple operations here
-                session.bulk_insert_mappings(Post, posts_data)
+                session.add_many(Post, posts_data)
                 session.bulk_update_mappings(User, users_data)
-                # Commits only if all operations succeeed
+                # Commits only if all operations succeed
         """
         session = self.session_factory()
-        transaction = session.begin()
         try:
-            yield session
-            transaction.commit()
+            yield BatchSession(session, chunk_size)
+            session.commit()
         except Exception:
-            transaction.rollback()
+            session.rollback()
             raise
         finally:
             session.close()
@@ -154,11 +213,16 @@ class DatabaseManager:
         
         checkpoint_path = self.database_path.parent / f"{checkpoint_name}.db"
         
-        # Use SQLite backup API for consistent snapshots
-        with sqlite3.connect(str(self.database_path)) as source:
-            with sqlite3.connect(str(checkpoint_path)) as backup:
-                source.backup(backup)
-        
+        # Use SQLite backup API for consistent snapshots; sqlite3's context
+        # manager only commits, so close the handles explicitly
+        source = sqlite3.connect(str(self.database_path))
+        backup = sqlite3.connect(str(checkpoint_path))
+        try:
+            source.backup(backup)
+        finally:
+            backup.close()
+            source.close()
+
         print(f"Checkpoint created: {checkpoint_path}")
         return str(checkpoint_path)
     
@@ -179,8 +243,21 @@ class DatabaseManager:
             self._engine = None
             self._session_factory = None
         
-        # Replace database file
-        shutil.copy2(checkpoint_file, self.database_path)
+        # Remove stale WAL sidecars so they can't overlay the restored image
+        for suffix in ("-wal", "-shm"):
+            Path(f"{self.database_path}{suffix}").unlink(missing_ok=True)
+
+        # Stream pages via the SQLite backup API instead of copying the
+        # whole file at once through Python
+        source = sqlite3.connect(str(checkpoint_file))
+        target = sqlite3.connect(str(self.database_path))
+        try:
+            source.backup(target, pages=1024)
+        finally:
+            target.close()
+            source.close()
+        # Process-level caches still describe the pre-restore data
+        clear_process_caches()
         print(f"Database restored from: {checkpoint_path}")
 
     def get_database_info(self) -> Dict[str, Any]:
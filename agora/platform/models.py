@@ -6,15 +6,15 @@ from datetime import datetime, timezone
 from typing import Optional
 from sqlalchemy import (
     Column, Integer, String, Text, DateTime, ForeignKey,
-    UniqueConstraint, Index, create_engine
+    UniqueConstraint, Index, create_engine, text
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 
 Base = declarative_base()
 
-def utc_now() -> datetime:
-    """Return current UTC timestamp"""
-    return datetime.now(timezone.utc)
+def utc_now(_now=datetime.now, _utc=timezone.utc) -> datetime:
+    """Return current UTC timestamp (globals pre-bound: called once per INSERT)"""
+    return _now(_utc)
 
 class User(Base):
     """User profiles and account information"""
@@ -24,6 +24,11 @@ class User(Base):
     username = Column(String(50), unique=True, nullable=True, index=True)
     bio = Column(Text, nullable=True)
 
+    # Denormalized counters, maintained by the relationship/post write paths
+    follower_count = Column(Integer, nullable=False, default=0)
+    following_count = Column(Integer, nullable=False, default=0)
+    post_count = Column(Integer, nullable=False, default=0)  # top-level posts
+
     # Timestamps
     created_at = Column(DateTime(timezone=True),nullable=False,default=utc_now)
     deleted_at = Column(DateTime(timezone=True),nullable=True) # soft delete
@@ -61,15 +66,44 @@ class Post(Base):
     title = Column(String(200), nullable=True, index=True)
     content = Column(Text, nullable=False)
 
+    # Denormalized author username so display paths can show @author
+    # without a users round-trip; update_user refreshes it on rename
+    author_username = Column(String(50), nullable=True)
+
+    # Denormalized counters, maintained by the reaction/comment write paths
+    like_count = Column(Integer, nullable=False, default=0)
+    comment_count = Column(Integer, nullable=False, default=0)
+
     # Timestamps
     created_at = Column(DateTime(timezone=True),nullable=False, default=utc_now)
     deleted_at = Column(DateTime(timezone=True),nullable=True) # soft delete
 
     # Relationships
     author = relationship("User", back_populates="posts")
-    parent_post = relationship("Post", remote_side=[id], backref="comments")
+    parent_post = relationship("Post", remote_side=[id], back_populates="comments")
+    comments = relationship("Post", back_populates="parent_post")
     reactions = relationship("Reaction", back_populates="post")
 
+    # Constraints
+    __table_args__ = (
+        Index('idx_posts_user_created', 'user_id', 'created_at'),
+        # Partial index keeps only live posts, matching the feed's
+        # deleted_at IS NULL filter for an index-only scan
+        Index('idx_posts_live', 'user_id', 'created_at',
+              sqlite_where=text('deleted_at IS NULL')),
+        # Comment listing: get_comments_for_post orders live children by time
+        Index('idx_comments_live', 'parent_post_id', 'created_at',
+              sqlite_where=text('deleted_at IS NULL')),
+        # Title lookup (semantic id resolution) only ever targets live,
+        # titled posts; the partial index stays small and covers the filter
+        Index('idx_posts_title_live', 'title',
+              sqlite_where=text('deleted_at IS NULL AND title IS NOT NULL')),
+        # Trending ranks live top-level posts by the like counter; a
+        # descending scan of this partial index stops after LIMIT rows
+        Index('idx_posts_trending', 'like_count', 'created_at',
+              sqlite_where=text('deleted_at IS NULL AND parent_post_id IS NULL')),
+    )
+
     def __repr__(self):
         post_type = "Comment" if self.parent_post_id else "Post"
         return f"<{post_type}(id={self.id}, user_id={self.user_id})>"
@@ -99,7 +133,15 @@ class Relationship(Base):
     # Constraints
     __table_args__ = (
         UniqueConstraint('follower_id', 'followed_id', 'relationship_type', name='unique_relationship'),
-        Index('idx_follower_followed', 'follower_id', 'followed_id')
+        Index('idx_follower_followed', 'follower_id', 'followed_id'),
+        # relationship_type sits between the id columns so the same index
+        # serves both the (follower, followed) probe and the typed
+        # following listing used by the feed
+        Index('idx_follower_live', 'follower_id', 'relationship_type', 'followed_id',
+              sqlite_where=text('deleted_at IS NULL')),
+        # Reverse direction for follower listings and friend classification
+        Index('idx_followed_live', 'followed_id', 'relationship_type',
+              sqlite_where=text('deleted_at IS NULL')),
     )
 
     def __repr__(self):
@@ -126,6 +168,13 @@ class Reaction(Base):
     __table_args__ = (
         UniqueConstraint('user_id', 'post_id', 'reaction_type', name='unique_reaction'),
         Index('idx_user_post', 'user_id', 'post_id'),
+        # Covers get_reaction_counts' GROUP BY reaction_type aggregation;
+        # partial because every reader filters deleted_at IS NULL
+        Index('idx_reaction_post_type', 'post_id', 'reaction_type',
+              sqlite_where=text('deleted_at IS NULL')),
+        # Covers count_user_reactions' per-user COUNT
+        Index('idx_reaction_user_live', 'user_id', 'reaction_type',
+              sqlite_where=text('deleted_at IS NULL')),
     )
     
     def __repr__(self):
@@ -172,6 +221,9 @@ class Membership(Base):
     __table_args__ = (
         UniqueConstraint('user_id', 'community_id', name='unique_membership'),
         Index('idx_user_community', 'user_id', 'community_id'),
+        # Member listings filter live memberships by community
+        Index('idx_membership_community_live', 'community_id',
+              sqlite_where=text('deleted_at IS NULL')),
     )
     
     def __repr__(self):
@@ -4,10 +4,13 @@ Atomic database operations.
 Low-level CRUD operations that respect soft deletes and provide the foundation for higher-level social media tools
 """
 
+import time
+from collections import Counter
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from sqlalchemy import and_, or_, func, desc
-from sqlalchemy.orm import Session
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import and_, or_, func, desc, insert, lambda_stmt, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, aliased, joinedload
 from sqlalchemy.exc import IntegrityError
 
 try:
@@ -15,6 +18,20 @@ try:
 except ImportError:
     from models import User, Post, Relationship, Reaction, Community, Membership, utc_now
 
+# Process-level caches registered here are flushed together when a
+# database is reset or restored (DatabaseManager calls
+# clear_process_caches); other modules register theirs on import
+_process_caches: List[dict] = []
+
+def register_process_cache(cache: dict) -> None:
+    """Register a module-level cache for clearing on database reset."""
+    _process_caches.append(cache)
+
+def clear_process_caches() -> None:
+    """Drop every registered process-level cache."""
+    for cache in _process_caches:
+        cache.clear()
+
 class DatabaseOperationError(Exception):
     """Base exception for database operation errors"""
     pass
@@ -38,7 +55,8 @@ class DuplicateError(DatabaseOperationError):
 def create_user(
     session: Session,
     username: str,
-    bio: Optional[str] = None
+    bio: Optional[str] = None,
+    flush: bool = True
 ) -> User:
     """
     Create a new user.
@@ -47,6 +65,9 @@ def create_user(
         session: Database session
         username: Unique username
         bio: Optional user bio
+        flush: Flush immediately (default); pass False when batching writes
+            so the unit of work can emit one multi-row INSERT. Note that
+            duplicate usernames then surface at the deferred flush/commit.
 
     Returns:
         Created User object
@@ -58,7 +79,9 @@ def create_user(
 
     try:
         session.add(user)
-        session.flush()
+        if flush:
+            session.flush()
+        invalidate_user_cache(session, username)
         return user
     except IntegrityError as e:
         session.rollback()
@@ -67,17 +90,116 @@ def create_user(
         else:
             raise DuplicateError(f"User creation failed: {e}")
         
+def create_users_bulk(
+    session: Session,
+    records: List[Dict[str, Any]],
+    chunk: int = 1000
+) -> List[int]:
+    """
+    Bulk-create users from a list of {"username": ..., "bio": ...} dicts.
+
+    Uses chunked executemany-style INSERTs instead of one ORM flush per
+    user, which matters during simulation bootstrap with many agents.
+
+    Args:
+        session: Database session
+        records: Column dicts, one per user
+        chunk: Number of rows per INSERT batch
+
+    Returns:
+        List of created user IDs, in input order
+
+    Raises:
+        DuplicateError: If any username already exists
+    """
+    user_ids: List[int] = []
+    try:
+        for i in range(0, len(records), chunk):
+            result = session.execute(
+                insert(User).returning(User.id),
+                records[i:i + chunk]
+            )
+            user_ids.extend(result.scalars().all())
+        invalidate_user_cache(session)
+        return user_ids
+    except IntegrityError as e:
+        session.rollback()
+        raise DuplicateError(f"Bulk user creation failed: {e}")
+
 def get_user_by_id(session: Session, user_id: int) -> Optional[User]:
     """Get user by ID, excluding soft-deleted users."""
-    return session.query(User).filter(
-        and_(User.id == user_id, User.deleted_at.is_(None))
-    ).first()
+    # session.get hits the identity map before emitting SQL
+    user = session.get(User, user_id)
+    return user if user is not None and user.deleted_at is None else None
 
 def get_user_by_username(session: Session, username: str) -> Optional[User]:
     """Get user by username, excluding soft-deleted users."""
+    # lambda_stmt caches the compiled SQL across calls; only the bound
+    # username changes per invocation
+    stmt = lambda_stmt(lambda: select(User).where(
+        User.username == username,
+        User.deleted_at.is_(None)
+    ))
+    return session.execute(stmt).scalars().first()
+
+def get_user_by_username_cached(session: Session, username: str) -> Optional[User]:
+    """
+    Session-scoped memoized variant of get_user_by_username.
+
+    Composed service calls resolve the same usernames several times per
+    request; the session.info scratch dict amortizes those lookups for the
+    lifetime of the session. User write paths invalidate via
+    invalidate_user_cache().
+    """
+    cache = session.info.setdefault('_user_cache', {})
+    if username in cache:
+        return cache[username]
+    user = get_user_by_username(session, username)
+    cache[username] = user
+    return user
+
+def invalidate_user_cache(session: Session, username: Optional[str] = None) -> None:
+    """Drop memoized username lookups after a user write."""
+    cache = session.info.get('_user_cache')
+    if cache is None:
+        return
+    if username is None:
+        cache.clear()
+    else:
+        cache.pop(username, None)
+
+def get_user_ids_by_usernames(
+    session: Session,
+    usernames: List[str]
+) -> Dict[str, int]:
+    """
+    Resolve several usernames to ids in one IN query.
+
+    Returns a {username: id} dict containing only live users, so callers
+    can distinguish which of the requested names were missing.
+    """
+    if not usernames:
+        return {}
+    results = session.query(User.username, User.id).filter(
+        and_(User.username.in_(usernames), User.deleted_at.is_(None))
+    ).all()
+    return {username: user_id for username, user_id in results}
+
+def user_exists(session: Session, user_id: int) -> bool:
+    """Check whether a live user exists without hydrating the row."""
+    return session.query(
+        session.query(User.id).filter(
+            and_(User.id == user_id, User.deleted_at.is_(None))
+        ).exists()
+    ).scalar()
+
+def get_users_by_ids(session: Session, user_ids: List[int]) -> List[User]:
+    """Get multiple users by ID in a single query, excluding soft-deleted users."""
+    if not user_ids:
+        return []
     return session.query(User).filter(
-        and_(User.username == username, User.deleted_at.is_(None))
-    ).first()
+        and_(User.id.in_(user_ids), User.deleted_at.is_(None))
+    ).all()
 
 def update_user(
     session: Session,
@@ -105,18 +227,33 @@ def update_user(
     for field, value in updates.items():
         if hasattr(user, field):
             setattr(user, field, value)
-    
+
     session.flush()
+    # Username may have changed; drop all memoized lookups
+    invalidate_user_cache(session)
+
+    if "username" in updates:
+        # Keep the denormalized author handle on the user's posts in
+        # step, and expire any already-loaded instances the raw UPDATE
+        # bypasses
+        session.query(Post).filter(Post.user_id == user_id).update(
+            {Post.author_username: user.username}, synchronize_session=False
+        )
+        for obj in list(session.identity_map.values()):
+            if isinstance(obj, Post) and obj.user_id == user_id:
+                session.expire(obj, ['author_username'])
     return user
 
-def soft_delete_user(session: Session, user_id: int) -> User:
+def soft_delete_user(session: Session, user_id: int, flush: bool = True) -> User:
     """Soft delete a user by setting deleted_at timestamp."""
     user = get_user_by_id(session, user_id)
     if not user:
         raise UserNotFoundError(f"User {user_id} not found")
     
     user.deleted_at = utc_now()
-    session.flush()
+    if flush:
+        session.flush()
+    invalidate_user_cache(session, user.username)
     return user
 
 # =================================================================
@@ -128,7 +265,9 @@ def create_post(
     user_id: int,
     content: str,
     parent_post_id: Optional[int] = None,
-    title: Optional[str] = None
+    title: Optional[str] = None,
+    flush: bool = True,
+    validate: bool = True
 ) -> Post:
     """
     Create a new post or comment.
@@ -138,6 +277,10 @@ def create_post(
         user_id: ID of the user creating the post
         content: Post content
         parent_post_id: If provided, creates a comment on that post
+        flush: Flush immediately (default); pass False when batching writes
+        validate: Verify user/parent existence (default); pass False when
+            the caller has already fetched and checked both, saving the
+            redundant EXISTS probes
         
     Returns:
         Created Post object
@@ -146,36 +289,90 @@ def create_post(
         UserNotFoundError: If user doesn't exist
         PostNotFoundError: If parent post doesn't exist
     """
-    # Verify user exists
-    if not get_user_by_id(session, user_id):
-        raise UserNotFoundError(f"User {user_id} not found")
-    
-    # Verify parent post exists if this is a comment
-    if parent_post_id and not get_post_by_id(session, parent_post_id):
-        raise PostNotFoundError(f"Parent post {parent_post_id} not found")
+    if validate:
+        # Verify user exists
+        if not user_exists(session, user_id):
+            raise UserNotFoundError(f"User {user_id} not found")
+
+        # Verify parent post exists if this is a comment. The explicit
+        # probe stays because the FK cannot reject soft-deleted parents;
+        # the is-not-None test keeps id 0 from skipping it.
+        if parent_post_id is not None and not post_exists(session, parent_post_id):
+            raise PostNotFoundError(f"Parent post {parent_post_id} not found")
     
+    # Denormalize the author username onto the row; session.get hits the
+    # identity map when the caller has already loaded the user
+    author = session.get(User, user_id)
+
     post = Post(
         user_id=user_id,
         content=content,
         parent_post_id=parent_post_id,
-        title=title
+        title=title,
+        author_username=author.username if author else None
     )
-    
+
     session.add(post)
-    session.flush()
+    if flush:
+        session.flush()
+
+    if parent_post_id is not None:
+        _adjust_post_counter(session, parent_post_id, Post.comment_count, 1)
+    else:
+        _adjust_user_counter(session, user_id, User.post_count, 1)
+
     return post
 
+def _adjust_post_counter(session: Session, post_id: int, column, delta: int) -> None:
+    """Atomically adjust a denormalized counter column on a post."""
+    session.query(Post).filter(Post.id == post_id).update(
+        {column: column + delta}, synchronize_session=False
+    )
+    # The UPDATE bypasses the identity map; expire the cached instance (if
+    # any) so in-session readers see the new counter value
+    target = session.identity_map.get(session.identity_key(Post, post_id))
+    if target is not None:
+        session.expire(target, [column.key])
+
+def _adjust_user_counter(session: Session, user_id: int, column, delta: int) -> None:
+    """Atomically adjust a denormalized counter column on a user."""
+    session.query(User).filter(User.id == user_id).update(
+        {column: column + delta}, synchronize_session=False
+    )
+    target = session.identity_map.get(session.identity_key(User, user_id))
+    if target is not None:
+        session.expire(target, [column.key])
+
 def get_post_by_id(session: Session, post_id: int) -> Optional[Post]:
     """Get post by ID, excluding soft-deleted posts."""
-    return session.query(Post).filter(
-        and_(Post.id == post_id, Post.deleted_at.is_(None))
-    ).first()
+    post = session.get(Post, post_id)
+    return post if post is not None and post.deleted_at is None else None
+
+def post_exists(session: Session, post_id: int) -> bool:
+    """Check whether a live post exists without hydrating the row."""
+    return session.query(
+        session.query(Post.id).filter(
+            and_(Post.id == post_id, Post.deleted_at.is_(None))
+        ).exists()
+    ).scalar()
+
+def filter_live_post_ids(session: Session, post_ids: List[int]) -> List[int]:
+    """Return the subset of ids that are live posts, in one IN query."""
+    if not post_ids:
+        return []
+    results = session.query(Post.id).filter(
+        and_(Post.id.in_(post_ids), Post.deleted_at.is_(None))
+    ).all()
+    return [post_id for (post_id,) in results]
 
 def get_post_by_title(session: Session, title: str) -> Optional[Post]:
     """Get post by title, excluding soft-deleted posts."""
-    return session.query(Post).filter(
-        and_(Post.title == title, Post.deleted_at.is_(None))
-    ).first()
+    # Hot lookup (semantic id resolution): cached statement + partial index
+    stmt = lambda_stmt(lambda: select(Post).where(
+        Post.title == title,
+        Post.deleted_at.is_(None)
+    ).limit(1))
+    return session.execute(stmt).scalars().first()
 
 def get_posts_by_user(
     session: Session, 
@@ -207,23 +404,242 @@ def get_posts_by_user(
     
     return query.order_by(desc(Post.created_at)).limit(limit).all()
 
-def get_comments_for_post(session: Session, post_id: int) -> List[Post]:
-    """Get all comments for a post, newest first."""
-    return session.query(Post).filter(
+def get_post_titles_by_user(
+    session: Session,
+    user_id: int,
+    limit: int = 100
+) -> List[str]:
+    """
+    Get titles of a user's recent top-level posts, newest first.
+
+    Projects only the title column so post listings never pull content
+    bodies off disk just to display headings.
+    """
+    results = session.query(Post.title).filter(
+        and_(
+            Post.user_id == user_id,
+            Post.parent_post_id.is_(None),
+            Post.deleted_at.is_(None),
+            Post.title.is_not(None)
+        )
+    ).order_by(desc(Post.created_at)).limit(limit).all()
+    return [title for (title,) in results]
+
+def count_posts_by_user(
+    session: Session,
+    user_id: int,
+    include_comments: bool = False
+) -> int:
+    """Count a user's live posts with SQL COUNT instead of len(list)."""
+    query = session.query(func.count(Post.id)).filter(
+        and_(
+            Post.user_id == user_id,
+            Post.deleted_at.is_(None)
+        )
+    )
+    if not include_comments:
+        query = query.filter(Post.parent_post_id.is_(None))
+    return query.scalar()
+
+def sum_user_post_likes(session: Session, user_id: int) -> int:
+    """Sum likes received across a user's live top-level posts in SQL."""
+    total = session.query(func.sum(Post.like_count)).filter(
         and_(
-            Post.parent_post_id == post_id,
+            Post.user_id == user_id,
+            Post.parent_post_id.is_(None),
             Post.deleted_at.is_(None)
         )
-    ).order_by(desc(Post.created_at)).all()
+    ).scalar()
+    return total or 0
 
-def soft_delete_post(session: Session, post_id: int) -> Post:
+def get_top_liked_post_titles(
+    session: Session,
+    user_id: int,
+    limit: int = 4
+) -> List[str]:
+    """
+    Get titles of a user's most-liked top-level posts, best first.
+
+    Orders by the denormalized like_count column so the top-k selection
+    happens in SQL with a LIMIT instead of sorting posts in Python.
+    """
+    results = session.query(Post.title).filter(
+        and_(
+            Post.user_id == user_id,
+            Post.parent_post_id.is_(None),
+            Post.deleted_at.is_(None),
+            Post.title.is_not(None),
+            Post.like_count > 0
+        )
+    ).order_by(desc(Post.like_count)).limit(limit).all()
+    return [title for (title,) in results]
+
+def get_posts_by_users(
+    session: Session,
+    user_ids: List[int],
+    limit: int = 50,
+    include_comments: bool = False
+) -> List[Post]:
+    """
+    Get recent posts from multiple users in a single query.
+
+    Args:
+        session: Database session
+        user_ids: User IDs to fetch posts for
+        limit: Maximum number of posts to return across all users
+        include_comments: If True, include comments; if False, only top-level posts
+
+    Returns:
+        List of Post objects, newest first
+    """
+    if not user_ids:
+        return []
+
+    query = session.query(Post).filter(
+        and_(
+            Post.user_id.in_(user_ids),
+            Post.deleted_at.is_(None)
+        )
+    )
+
+    if not include_comments:
+        query = query.filter(Post.parent_post_id.is_(None))
+
+    return query.order_by(desc(Post.created_at)).limit(limit).all()
+
+def get_feed_post_rows(
+    session: Session,
+    user_ids: List[int],
+    limit: int = 50
+) -> List[Any]:
+    """
+    Get top-level feed posts joined with author usernames as plain rows.
+
+    Projects only the columns the feed needs, skipping ORM instrumentation
+    and identity-map bookkeeping for bulk reads.
+
+    Returns:
+        List of Row tuples (id, title, username, content, created_at,
+        like_count, comment_count), newest first
+    """
+    if not user_ids:
+        return []
+    return session.execute(
+        select(
+            Post.id, Post.title, User.username, Post.content,
+            Post.created_at, Post.like_count, Post.comment_count
+        ).join(User, User.id == Post.user_id).where(
+            Post.user_id.in_(user_ids),
+            Post.deleted_at.is_(None),
+            Post.parent_post_id.is_(None),
+            User.deleted_at.is_(None)
+        ).order_by(desc(Post.created_at)).limit(limit)
+    ).all()
+
+def get_comment_counts(session: Session, post_ids: List[int]) -> Dict[int, int]:
+    """Get comment counts for multiple posts in one grouped query."""
+    if not post_ids:
+        return {}
+    results = session.query(
+        Post.parent_post_id,
+        func.count(Post.id)
+    ).filter(
+        and_(
+            Post.parent_post_id.in_(post_ids),
+            Post.deleted_at.is_(None)
+        )
+    ).group_by(Post.parent_post_id).all()
+
+    return {post_id: count for post_id, count in results}
+
+def get_comments_for_post(
+    session: Session,
+    post_id: int,
+    limit: Optional[int] = None
+) -> List[Post]:
+    """Get comments for a post, newest first, optionally capped at limit."""
+    stmt = lambda_stmt(lambda: select(Post).where(
+        Post.parent_post_id == post_id,
+        Post.deleted_at.is_(None)
+    ).order_by(desc(Post.created_at)))
+    if limit is not None:
+        stmt += lambda stmt: stmt.limit(limit)
+    return list(session.execute(stmt).scalars())
+
+def get_post_meta(session: Session, post_id: int):
+    """
+    Fetch a post's validation/display columns without ORM hydration.
+
+    Returns a plain row with (id, user_id, parent_post_id, title,
+    author_username, deleted_at) — enough for existence checks,
+    comment-vs-post branching, and @author display. Callers that need
+    content or counters should use get_post_by_id instead.
+    """
+    return session.query(
+        Post.id,
+        Post.user_id,
+        Post.parent_post_id,
+        Post.title,
+        Post.author_username,
+        Post.deleted_at
+    ).filter(Post.id == post_id).first()
+
+def get_comment_tree(session: Session, post_id: int):
+    """
+    Get a post's full comment thread as flat rows in tree (path) order.
+
+    A recursive CTE walks from the post's direct comments down through
+    every reply level in one query, returning
+    (id, parent_post_id, depth, path, content, author_username,
+    created_at) rows sorted so each comment immediately precedes its
+    replies. Callers can rebuild the nesting with a single stack walk.
+    """
+    tree = select(
+        Post.id,
+        Post.parent_post_id,
+        literal(1).label('depth'),
+        func.printf('%012d', Post.id).label('path'),
+        Post.content,
+        Post.author_username,
+        Post.created_at
+    ).where(
+        Post.parent_post_id == post_id,
+        Post.deleted_at.is_(None)
+    ).cte('comment_tree', recursive=True)
+
+    reply = aliased(Post)
+    tree = tree.union_all(
+        select(
+            reply.id,
+            reply.parent_post_id,
+            tree.c.depth + 1,
+            func.printf('%s/%012d', tree.c.path, reply.id),
+            reply.content,
+            reply.author_username,
+            reply.created_at
+        ).where(
+            reply.parent_post_id == tree.c.id,
+            reply.deleted_at.is_(None)
+        )
+    )
+
+    return session.execute(select(tree).order_by(tree.c.path)).all()
+
+def soft_delete_post(session: Session, post_id: int, flush: bool = True) -> Post:
     """Soft delete a post by setting deleted_at timestamp."""
     post = get_post_by_id(session, post_id)
     if not post:
         raise PostNotFoundError(f"Post {post_id} not found")
     
     post.deleted_at = utc_now()
-    session.flush()
+    if flush:
+        session.flush()
+
+    if post.parent_post_id is not None:
+        _adjust_post_counter(session, post.parent_post_id, Post.comment_count, -1)
+    else:
+        _adjust_user_counter(session, post.user_id, User.post_count, -1)
+
     return post
 
 # =================================================================
@@ -246,32 +662,58 @@ def create_relationship(
         relationship_type: Type of relationship ("follow", "friend", "block", etc.)
         
     Returns:
-        Created Relationship object
+        Created or revived Relationship object
         
     Raises:
         UserNotFoundError: If either user doesn't exist
-        DuplicateError: If relationship already exists
+        DuplicateError: If an identical active relationship already exists
     """
-    # Verify both users exist
-    if not get_user_by_id(session, follower_id):
+    # Verify both users exist with a single IN query
+    live_ids = {
+        row[0] for row in session.query(User.id).filter(
+            and_(
+                User.id.in_([follower_id, followed_id]),
+                User.deleted_at.is_(None)
+            )
+        )
+    }
+    if follower_id not in live_ids:
         raise UserNotFoundError(f"User {follower_id} not found")
-    if not get_user_by_id(session, followed_id):
+    if followed_id not in live_ids:
         raise UserNotFoundError(f"User {followed_id} not found")
     
-    # Check for existing relationship
-    existing = get_relationship(session, follower_id, followed_id, relationship_type)
-    if existing:
-        raise DuplicateError(f"Relationship already exists: {follower_id} -> {followed_id} ({relationship_type})")
-    
-    relationship = Relationship(
+    # Atomic UPSERT replaces the duplicate pre-check: insert the edge or
+    # revive a soft-deleted one; RETURNING yields a row only when the
+    # edge was actually activated, matching create_reaction
+    stmt = sqlite_insert(Relationship).values(
         follower_id=follower_id,
         followed_id=followed_id,
         relationship_type=relationship_type
+    ).on_conflict_do_update(
+        index_elements=['follower_id', 'followed_id', 'relationship_type'],
+        set_={'deleted_at': None},
+        where=(Relationship.deleted_at.is_not(None))
+    ).returning(Relationship.id)
+    activated = session.execute(stmt).first()
+
+    if activated is None:
+        raise DuplicateError(f"Relationship already exists: {follower_id} -> {followed_id} ({relationship_type})")
+
+    # Keep the denormalized follow counters in step with the write
+    if relationship_type == "follow":
+        _adjust_user_counter(session, followed_id, User.follower_count, 1)
+        _adjust_user_counter(session, follower_id, User.following_count, 1)
+        _adjust_following_cache(session, follower_id, followed_id, add=True)
+
+    # A revived edge may be cached with its old deleted_at; expire before
+    # re-reading
+    cached = session.identity_map.get(
+        session.identity_key(Relationship, activated.id)
     )
-    
-    session.add(relationship)
-    session.flush()
-    return relationship
+    if cached is not None:
+        session.expire(cached)
+
+    return get_relationship(session, follower_id, followed_id, relationship_type)
 
 def get_relationship(
     session: Session,
@@ -280,18 +722,136 @@ def get_relationship(
     relationship_type: str = "follow"
 ) -> Optional[Relationship]:
     """Get specific relationship between two users."""
-    return session.query(Relationship).filter(
+    stmt = lambda_stmt(lambda: select(Relationship).where(
+        Relationship.follower_id == follower_id,
+        Relationship.followed_id == followed_id,
+        Relationship.relationship_type == relationship_type,
+        Relationship.deleted_at.is_(None)
+    ))
+    return session.execute(stmt).scalars().first()
+
+def get_followers(session: Session, user_id: int) -> List[User]:
+    """Get all users following the specified user."""
+    # Correlated EXISTS instead of a join: no fanout if duplicate edges
+    # ever appear, and the planner turns it into an index probe
+    return session.query(User).filter(
+        User.deleted_at.is_(None),
+        session.query(Relationship.id).filter(
+            and_(
+                Relationship.follower_id == User.id,
+                Relationship.followed_id == user_id,
+                Relationship.relationship_type == "follow",
+                Relationship.deleted_at.is_(None)
+            )
+        ).exists()
+    ).all()
+
+
+def get_following(session: Session, user_id: int) -> List[User]:
+    """Get all users that the specified user is following."""
+    return session.query(User).filter(
+        User.deleted_at.is_(None),
+        session.query(Relationship.id).filter(
+            and_(
+                Relationship.follower_id == user_id,
+                Relationship.followed_id == User.id,
+                Relationship.relationship_type == "follow",
+                Relationship.deleted_at.is_(None)
+            )
+        ).exists()
+    ).all()
+
+
+def count_followers(session: Session, user_id: int) -> int:
+    """Count active followers without materializing the follower list."""
+    return session.query(func.count(Relationship.id)).filter(
         and_(
-            Relationship.follower_id == follower_id,
-            Relationship.followed_id == followed_id,
-            Relationship.relationship_type == relationship_type,
+            Relationship.followed_id == user_id,
+            Relationship.relationship_type == "follow",
             Relationship.deleted_at.is_(None)
         )
-    ).first()
+    ).scalar()
 
-def get_followers(session: Session, user_id: int) -> List[User]:
-    """Get all users following the specified user."""
-    return session.query(User).join(
+
+def count_following(session: Session, user_id: int) -> int:
+    """Count active follows without materializing the following list."""
+    return session.query(func.count(Relationship.id)).filter(
+        and_(
+            Relationship.follower_id == user_id,
+            Relationship.relationship_type == "follow",
+            Relationship.deleted_at.is_(None)
+        )
+    ).scalar()
+
+
+# Follow-adjacency cache: the feed re-reads "who does this user follow"
+# on every call, so keep the id set in memory and maintain it from the
+# relationship write paths (the Redis-SET pattern, in process). Entries
+# expire after a short TTL like the other module caches, so stale sets —
+# from a rolled-back write the adjustment hooks saw, or a soft-deleted
+# followee — heal on their own.
+_FOLLOWING_TTL = 30.0
+_following_ids_cache: Dict[Tuple[str, int], Tuple[float, set]] = {}
+_FOLLOWING_CACHE_MAX = 4096
+register_process_cache(_following_ids_cache)
+
+def _bind_cache_key(session: Session) -> str:
+    """
+    Cache-key prefix identifying the session's database.
+
+    File-backed databases are distinguished by URL; in-memory databases
+    all share the ':memory:' URL, so the engine identity is appended to
+    keep two separate in-memory databases from sharing cache entries.
+    """
+    bind = session.get_bind()
+    url = str(bind.url)
+    if url.endswith(":memory:"):
+        return f"{url}#{id(bind)}"
+    return url
+
+def get_following_ids(session: Session, user_id: int) -> List[int]:
+    """Get ids of live users the user follows, via the adjacency cache."""
+    key = (_bind_cache_key(session), user_id)
+    entry = _following_ids_cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return list(entry[1])
+
+    results = session.query(Relationship.followed_id).join(
+        User, User.id == Relationship.followed_id
+    ).filter(
+        and_(
+            Relationship.follower_id == user_id,
+            Relationship.relationship_type == "follow",
+            Relationship.deleted_at.is_(None),
+            User.deleted_at.is_(None)
+        )
+    ).all()
+    ids = {followed_id for (followed_id,) in results}
+    if len(_following_ids_cache) >= _FOLLOWING_CACHE_MAX:
+        _following_ids_cache.clear()
+    _following_ids_cache[key] = (time.monotonic() + _FOLLOWING_TTL, ids)
+    return list(ids)
+
+def _adjust_following_cache(
+    session: Session,
+    follower_id: int,
+    followed_id: int,
+    add: bool
+) -> None:
+    """Keep a cached adjacency set in step with a follow edge write."""
+    entry = _following_ids_cache.get(
+        (_bind_cache_key(session), follower_id)
+    )
+    if entry is None or entry[0] <= time.monotonic():
+        return
+    if add:
+        entry[1].add(followed_id)
+    else:
+        entry[1].discard(followed_id)
+
+def get_follower_usernames(session: Session, user_id: int) -> List[str]:
+    """Get usernames of active followers without hydrating User objects."""
+    results = session.query(User.username).join(
         Relationship, User.id == Relationship.follower_id
     ).filter(
         and_(
@@ -301,11 +861,12 @@ def get_followers(session: Session, user_id: int) -> List[User]:
             User.deleted_at.is_(None)
         )
     ).all()
+    return [username for (username,) in results]
 
 
-def get_following(session: Session, user_id: int) -> List[User]:
-    """Get all users that the specified user is following."""
-    return session.query(User).join(
+def get_following_usernames(session: Session, user_id: int) -> List[str]:
+    """Get usernames the user follows without hydrating User objects."""
+    results = session.query(User.username).join(
         Relationship, User.id == Relationship.followed_id
     ).filter(
         and_(
@@ -315,19 +876,75 @@ def get_following(session: Session, user_id: int) -> List[User]:
             User.deleted_at.is_(None)
         )
     ).all()
+    return [username for (username,) in results]
+
+
+def _friend_usernames_query(session: Session, user_id: int):
+    """Build the query selecting usernames of a user's active friends."""
+    friend = aliased(Relationship)
+    return session.query(User.username).join(
+        Relationship, User.id == Relationship.follower_id
+    ).join(
+        friend, and_(
+            friend.follower_id == User.id,
+            friend.followed_id == user_id,
+            friend.relationship_type == "friend",
+            friend.deleted_at.is_(None)
+        )
+    ).filter(
+        and_(
+            Relationship.followed_id == user_id,
+            Relationship.relationship_type == "follow",
+            Relationship.deleted_at.is_(None),
+            User.deleted_at.is_(None)
+        )
+    )
+
+
+def get_friend_usernames(session: Session, user_id: int) -> List[str]:
+    """
+    Get usernames of followers who also have an active 'friend' relationship
+    with the user, resolved in one self-join query instead of one probe per
+    follower.
+    """
+    results = _friend_usernames_query(session, user_id).all()
+    return [username for (username,) in results]
+
+
+def get_mutual_friend_usernames(
+    session: Session,
+    user_id_a: int,
+    user_id_b: int
+) -> List[str]:
+    """
+    Get usernames befriended by both users via SQL INTERSECT.
+
+    Only the intersection crosses the wire, instead of both full friend
+    lists being fetched and intersected in Python.
+    """
+    query = _friend_usernames_query(session, user_id_a).intersect(
+        _friend_usernames_query(session, user_id_b)
+    )
+    return [username for (username,) in query.all()]
 
 
 def soft_delete_relationship(
     session: Session,
     follower_id: int,
     followed_id: int,
-    relationship_type: str = "follow"
+    relationship_type: str = "follow",
+    flush: bool = True
 ) -> Optional[Relationship]:
     """Soft delete a relationship (unfollow, unfriend, etc.)."""
     relationship = get_relationship(session, follower_id, followed_id, relationship_type)
     if relationship:
         relationship.deleted_at = utc_now()
-        session.flush()
+        if flush:
+            session.flush()
+        if relationship_type == "follow":
+            _adjust_user_counter(session, followed_id, User.follower_count, -1)
+            _adjust_user_counter(session, follower_id, User.following_count, -1)
+            _adjust_following_cache(session, follower_id, followed_id, add=False)
     return relationship
 
 # =================================================================
@@ -356,30 +973,98 @@ def create_reaction(
         UserNotFoundError: If user doesn't exist
         PostNotFoundError: If post doesn't exist
     """
-    # Verify user and post exist
-    if not get_user_by_id(session, user_id):
+    # Verify user and post exist; both EXISTS probes share one round-trip
+    user_ok, post_ok = session.query(
+        session.query(User.id).filter(
+            and_(User.id == user_id, User.deleted_at.is_(None))
+        ).exists(),
+        session.query(Post.id).filter(
+            and_(Post.id == post_id, Post.deleted_at.is_(None))
+        ).exists()
+    ).one()
+    if not user_ok:
         raise UserNotFoundError(f"User {user_id} not found")
-    if not get_post_by_id(session, post_id):
+    if not post_ok:
         raise PostNotFoundError(f"Post {post_id} not found")
     
-    # Check for existing reaction
-    existing = get_reaction(session, user_id, post_id, reaction_type)
-    if existing:
-        # Undelete if it was soft-deleted
-        if existing.deleted_at:
-            existing.deleted_at = None
-            session.flush()
-        return existing
-    
-    reaction = Reaction(
+    # Atomic UPSERT: insert the reaction or revive a soft-deleted one. The
+    # conditional WHERE makes RETURNING yield a row only when the reaction
+    # was actually activated, which drives the like counter.
+    stmt = sqlite_insert(Reaction).values(
         user_id=user_id,
         post_id=post_id,
         reaction_type=reaction_type
-    )
-    
-    session.add(reaction)
-    session.flush()
-    return reaction
+    ).on_conflict_do_update(
+        index_elements=['user_id', 'post_id', 'reaction_type'],
+        set_={'deleted_at': None},
+        where=(Reaction.deleted_at.is_not(None))
+    ).returning(Reaction.id)
+    activated = session.execute(stmt).first()
+
+    if activated is not None:
+        if reaction_type == "like":
+            _adjust_post_counter(session, post_id, Post.like_count, 1)
+        # The UPSERT bypasses the identity map; a revived reaction may be
+        # cached with its old deleted_at, so expire it before re-reading
+        cached = session.identity_map.get(
+            session.identity_key(Reaction, activated.id)
+        )
+        if cached is not None:
+            session.expire(cached)
+        invalidate_reaction_counts(session, post_id)
+
+    return get_reaction(session, user_id, post_id, reaction_type)
+
+def create_reactions_bulk(
+    session: Session,
+    rows: List[Dict[str, int]],
+    reaction_type: str = "like"
+) -> List[int]:
+    """
+    Insert or revive many reactions with one multi-row UPSERT.
+
+    Args:
+        session: Database session
+        rows: Dicts with "user_id" and "post_id" keys; callers must have
+            validated that the referenced users and posts are live
+        reaction_type: Reaction type applied to every row
+
+    Returns:
+        post_ids of the reactions actually activated (new or revived);
+        rows that were already active are absent, mirroring the RETURNING
+        semantics of create_reaction.
+    """
+    if not rows:
+        return []
+    values = [
+        {
+            "user_id": row["user_id"],
+            "post_id": row["post_id"],
+            "reaction_type": reaction_type
+        }
+        for row in rows
+    ]
+    stmt = sqlite_insert(Reaction).values(values).on_conflict_do_update(
+        index_elements=['user_id', 'post_id', 'reaction_type'],
+        set_={'deleted_at': None},
+        where=(Reaction.deleted_at.is_not(None))
+    ).returning(Reaction.id, Reaction.post_id)
+    activated = session.execute(stmt).all()
+
+    if reaction_type == "like":
+        # One counter UPDATE per distinct post, not per reaction
+        deltas = Counter(post_id for _, post_id in activated)
+        for post_id, delta in deltas.items():
+            _adjust_post_counter(session, post_id, Post.like_count, delta)
+    for reaction_id, post_id in activated:
+        cached = session.identity_map.get(
+            session.identity_key(Reaction, reaction_id)
+        )
+        if cached is not None:
+            session.expire(cached)
+        invalidate_reaction_counts(session, post_id)
+
+    return [post_id for _, post_id in activated]
 
 def get_reaction(
     session: Session,
@@ -388,14 +1073,13 @@ def get_reaction(
     reaction_type: str="like"
 ) -> Optional[Reaction]:
     """Get specific reaction from a user to a post"""
-    return session.query(Reaction).filter(
-        and_(
-            Reaction.user_id == user_id,
-            Reaction.post_id == post_id,
-            Reaction.reaction_type == reaction_type,
-            Reaction.deleted_at.is_(None)
-        )
-    ).first()
+    stmt = lambda_stmt(lambda: select(Reaction).where(
+        Reaction.user_id == user_id,
+        Reaction.post_id == post_id,
+        Reaction.reaction_type == reaction_type,
+        Reaction.deleted_at.is_(None)
+    ))
+    return session.execute(stmt).scalars().first()
 
 def get_post_reactions(
     session: Session,
@@ -416,6 +1100,27 @@ def get_post_reactions(
     return query.all()
 
 
+def get_post_reactions_with_usernames(
+    session: Session,
+    post_id: int
+) -> List[Tuple[str, str]]:
+    """
+    Get (reaction_type, username) tuples for a post's live reactions.
+
+    Joins reactions to users in SQL and returns flat tuples, so popular
+    posts don't hydrate thousands of ORM objects just to list names.
+    """
+    return session.query(Reaction.reaction_type, User.username).join(
+        User, Reaction.user_id == User.id
+    ).filter(
+        and_(
+            Reaction.post_id == post_id,
+            Reaction.deleted_at.is_(None),
+            User.deleted_at.is_(None)
+        )
+    ).all()
+
+
 def get_reaction_counts(session: Session, post_id: int) -> Dict[str, int]:
     """Get reaction counts by type for a post."""
     results = session.query(
@@ -430,6 +1135,76 @@ def get_reaction_counts(session: Session, post_id: int) -> Dict[str, int]:
     
     return {reaction_type: count for reaction_type, count in results}
 
+# Reaction counts are re-aggregated on every post view; a short TTL keeps
+# hot posts out of the database without letting counts drift for long.
+# Keys go through _bind_cache_key so separate databases (tests!) never
+# collide, including in-memory databases that share a URL.
+_REACTION_COUNTS_TTL = 30.0
+_reaction_counts_cache: Dict[Tuple[str, int], Tuple[float, Dict[str, int]]] = {}
+_REACTION_COUNTS_CACHE_MAX = 4096
+register_process_cache(_reaction_counts_cache)
+
+def get_reaction_counts_cached(session: Session, post_id: int) -> Dict[str, int]:
+    """
+    Get reaction counts for a post through a short-lived in-process cache.
+
+    Entries expire after _REACTION_COUNTS_TTL seconds and are dropped
+    eagerly by the reaction write paths, so reads stay fresh within a
+    process while hot posts skip the GROUP BY aggregation.
+    """
+    key = (_bind_cache_key(session), post_id)
+    entry = _reaction_counts_cache.get(key)
+    now = time.monotonic()
+    if entry is not None and entry[0] > now:
+        return dict(entry[1])
+
+    counts = get_reaction_counts(session, post_id)
+    if len(_reaction_counts_cache) >= _REACTION_COUNTS_CACHE_MAX:
+        _reaction_counts_cache.clear()
+    _reaction_counts_cache[key] = (now + _REACTION_COUNTS_TTL, counts)
+    return dict(counts)
+
+def invalidate_reaction_counts(session: Session, post_id: int) -> None:
+    """Drop the cached reaction counts for a post after a write."""
+    _reaction_counts_cache.pop((_bind_cache_key(session), post_id), None)
+
+def get_reaction_counts_bulk(
+    session: Session,
+    post_ids: List[int]
+) -> Dict[int, Dict[str, int]]:
+    """Get reaction counts by type for multiple posts in one grouped query."""
+    if not post_ids:
+        return {}
+    results = session.query(
+        Reaction.post_id,
+        Reaction.reaction_type,
+        func.count(Reaction.id)
+    ).filter(
+        and_(
+            Reaction.post_id.in_(post_ids),
+            Reaction.deleted_at.is_(None)
+        )
+    ).group_by(Reaction.post_id, Reaction.reaction_type).all()
+
+    counts: Dict[int, Dict[str, int]] = {}
+    for post_id, reaction_type, count in results:
+        counts.setdefault(post_id, {})[reaction_type] = count
+    return counts
+
+def count_user_reactions(
+    session: Session,
+    user_id: int,
+    reaction_type: str = "like"
+) -> int:
+    """Count a user's reactions of a given type without hydrating rows."""
+    return session.query(func.count(Reaction.id)).filter(
+        and_(
+            Reaction.user_id == user_id,
+            Reaction.reaction_type == reaction_type,
+            Reaction.deleted_at.is_(None)
+        )
+    ).scalar()
+
 def get_user_reactions(session: Session, user_id: int) -> List[Reaction]:
     """Get all reactions by a user (excluding soft-deleted ones)."""
     return session.query(Reaction).filter(
@@ -443,13 +1218,18 @@ def soft_delete_reaction(
     session: Session,
     user_id: int,
     post_id: int,
-    reaction_type: str = "like"
+    reaction_type: str = "like",
+    flush: bool = True
 ) -> Optional[Reaction]:
     """Soft delete a reaction (remove like, etc.)."""
     reaction = get_reaction(session, user_id, post_id, reaction_type)
     if reaction:
         reaction.deleted_at = utc_now()
-        session.flush()
+        if flush:
+            session.flush()
+        if reaction_type == "like":
+            _adjust_post_counter(session, post_id, Post.like_count, -1)
+        invalidate_reaction_counts(session, post_id)
     return reaction
 
 # =================================================================
@@ -460,7 +1240,8 @@ def create_community(
     session: Session,
     name: str,
     created_by: int,
-    description: Optional[str] = None
+    description: Optional[str] = None,
+    flush: bool = True
 ) -> Community:
     """
     Create a new community.
@@ -470,6 +1251,7 @@ def create_community(
         name: Unique community name
         created_by: ID of the user creating the community
         description: Optional community description
+        flush: Flush immediately (default); pass False when batching writes
         
     Returns:
         Created Community object
@@ -490,7 +1272,8 @@ def create_community(
     
     try:
         session.add(community)
-        session.flush()
+        if flush:
+            session.flush()
         return community
     except IntegrityError:
         session.rollback()
@@ -498,16 +1281,23 @@ def create_community(
     
 def get_community_by_id(session: Session, community_id: int) -> Optional[Community]:
     """Get community by ID, excluding soft-deleted communities."""
-    return session.query(Community).filter(
-        and_(Community.id == community_id, Community.deleted_at.is_(None))
-    ).first()
+    community = session.get(Community, community_id)
+    return community if community is not None and community.deleted_at is None else None
 
 
 def get_community_by_name(session: Session, name: str) -> Optional[Community]:
-    """Get community by name, excluding soft-deleted communities."""
-    return session.query(Community).filter(
-        and_(Community.name == name, Community.deleted_at.is_(None))
-    ).first()
+    """Get community by name, excluding soft-deleted communities.
+
+    Eager-loads the creator in the same statement: every view that shows
+    a community also shows who created it.
+    """
+    stmt = lambda_stmt(lambda: select(Community).options(
+        joinedload(Community.creator)
+    ).where(
+        Community.name == name,
+        Community.deleted_at.is_(None)
+    ).limit(1))
+    return session.execute(stmt).scalars().first()
 
 # =================================================================
 # MEMBERSHIP OPERATIONS
@@ -517,7 +1307,8 @@ def create_membership(
     session: Session,
     user_id: int,
     community_id: int,
-    role: str="member"
+    role: str="member",
+    flush: bool = True
 ) -> Membership:
     """
     Create a community membership.
@@ -527,6 +1318,7 @@ def create_membership(
         user_id: ID of the user joining
         community_id: ID of the community
         role: User role in the community
+        flush: Flush immediately (default); pass False when batching writes
         
     Returns:
         Created Membership object
@@ -537,7 +1329,7 @@ def create_membership(
         DuplicateError: If membership already exists
     """
     # Verify user and community exist
-    if not get_user_by_id(session, user_id):
+    if not user_exists(session, user_id):
         raise UserNotFoundError(f"User {user_id} not found")
     if not get_community_by_id(session, community_id):
         raise DatabaseOperationError(f"Community {community_id} not found")
@@ -554,7 +1346,8 @@ def create_membership(
     )
     
     session.add(membership)
-    session.flush()
+    if flush:
+        session.flush()
     return membership
 
 def get_membership(
@@ -563,13 +1356,12 @@ def get_membership(
     community_id: int
 ) -> Optional[Membership]:
     """Get specific membership."""
-    return session.query(Membership).filter(
-        and_(
-            Membership.user_id == user_id,
-            Membership.community_id == community_id,
-            Membership.deleted_at.is_(None)
-        )
-    ).first()
+    stmt = lambda_stmt(lambda: select(Membership).where(
+        Membership.user_id == user_id,
+        Membership.community_id == community_id,
+        Membership.deleted_at.is_(None)
+    ).limit(1))
+    return session.execute(stmt).scalars().first()
 
 
 def get_user_communities(session: Session, user_id: int) -> List[Community]:
@@ -585,6 +1377,47 @@ def get_user_communities(session: Session, user_id: int) -> List[Community]:
     ).all()
 
 
+def get_community_member_ids(session: Session, community_ids: List[int]) -> List[int]:
+    """Get distinct member user IDs across multiple communities in one query."""
+    if not community_ids:
+        return []
+    results = session.query(Membership.user_id).join(
+        User, User.id == Membership.user_id
+    ).filter(
+        and_(
+            Membership.community_id.in_(community_ids),
+            Membership.deleted_at.is_(None),
+            User.deleted_at.is_(None)
+        )
+    ).distinct().all()
+    return [user_id for (user_id,) in results]
+
+
+def get_community_top_members(
+    session: Session,
+    community_id: int,
+    exclude_user_id: Optional[int] = None,
+    limit: int = 4
+) -> List[Tuple[str, Optional[str]]]:
+    """
+    Get (username, bio) for a community's earliest members, capped in SQL.
+
+    Excludes exclude_user_id (typically the creator) before the LIMIT so
+    the cap isn't spent on a row the caller would drop anyway.
+    """
+    query = session.query(User.username, User.bio).join(
+        Membership, User.id == Membership.user_id
+    ).filter(
+        and_(
+            Membership.community_id == community_id,
+            Membership.deleted_at.is_(None),
+            User.deleted_at.is_(None)
+        )
+    )
+    if exclude_user_id is not None:
+        query = query.filter(User.id != exclude_user_id)
+    return query.order_by(Membership.joined_at).limit(limit).all()
+
 def get_community_members(session: Session, community_id: int) -> List[User]:
     """Get all members of a community."""
     return session.query(User).join(
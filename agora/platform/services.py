@@ -5,12 +5,30 @@ High-level social media operations that compose atomic operations into complete
 Used by platform/, agents/, and analysis/ modules for standard social media behaviors.
 """
 
+import time
 from datetime import datetime
 from typing import Optional
 from sqlalchemy.orm import Session
 
 from . import operations as _ops
 
+def _err(message: str) -> dict:
+    """Build the standard failure envelope (single allocation site)."""
+    return {"success": False, "message": message, "data": None}
+
+class _LookupError(Exception):
+    """Raised when a required user is missing; carries the ready envelope."""
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.response = _err(message)
+
+def _require_user(session: Session, username: str, label: str = "User"):
+    """Resolve a live user via the session cache or raise _LookupError."""
+    user = _ops.get_user_by_username_cached(session, username)
+    if not user:
+        raise _LookupError(f"{label} @{username} not found")
+    return user
+
 # ============================================================================
 # USER SERVICES
 # ============================================================================
@@ -24,20 +42,25 @@ def create_user_account(
     try:
         user = _ops.create_user(session, username, bio)
         
-        # For new user creation, use username as both agent and target
-        profile_result = _agent_get_user_profile(session, username, username)
-        
+        # A brand-new user's profile is known without querying: every
+        # counter is definitionally zero and there are no posts yet
         return {
             "success": True,
             "message": f"User @{username} created successfully",
-            "data": profile_result["data"] if profile_result["success"] else None
+            "data": {
+                "agent_username": username,
+                "target_username": username,
+                "bio": user.bio or "",
+                "follower_count": 0,
+                "following_count": 0,
+                "post_count": 0,
+                "likes_received": 0,
+                "likes_given": 0,
+                "top_liked_posts": []
+            }
         }
     except _ops.DuplicateError as e:
-        return {
-            "success": False,
-            "message": str(e),
-            "data": None
-        }
+        return _err(str(e))
 
 # ============================================================================
 # CONTENT CREATE
@@ -53,27 +76,14 @@ def agent_create_post(
     try:
         # Validate inputs
         if not title or not title.strip():
-            return {
-                "success": False,
-                "message": "Title cannot be empty",
-                "data": None
-            }
+            return _err("Title cannot be empty")
         if not content or not content.strip():
-            return {
-                "success": False,
-                "message": "Content cannot be empty",
-                "data": None
-            }
+            return _err("Content cannot be empty")
         
-        user = _ops.get_user_by_username(session, agent_username)
-        if not user:
-            return {
-                "success": False,
-                "message": f"User @{agent_username} not found",
-                "data": None
-            }
+        user = _require_user(session, agent_username)
         
-        post = _ops.create_post(session, user.id, content, title=title.strip())
+        # User already validated above; skip the redundant probe
+        post = _ops.create_post(session, user.id, content, title=title.strip(), validate=False)
         
         return {
             "success": True,
@@ -85,12 +95,10 @@ def agent_create_post(
                 "created_at": post.created_at.isoformat()
             }
         }
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to create post: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to create post: {str(e)}")
 
 def _agent_create_comment(
     session: Session,
@@ -102,30 +110,17 @@ def _agent_create_comment(
     try:
         # Validate inputs
         if not content or not content.strip():
-            return {
-                "success": False,
-                "message": "Content cannot be empty",
-                "data": None
-            }
+            return _err("Content cannot be empty")
         
-        user = _ops.get_user_by_username(session, agent_username)
-        if not user:
-            return {
-                "success": False,
-                "message": f"User @{agent_username} not found",
-                "data": None
-            }
+        user = _require_user(session, agent_username)
         
         # Validate post exists and is not deleted
         parent_post = _ops.get_post_by_id(session, post_id)
         if not parent_post or parent_post.deleted_at:
-            return {
-                "success": False,
-                "message": f"Post {post_id} not found",
-                "data": None
-            }
+            return _err(f"Post {post_id} not found")
         
-        comment = _ops.create_post(session, user.id, content.strip(), parent_post_id=post_id)
+        # User and parent already validated above; skip the re-probes
+        comment = _ops.create_post(session, user.id, content.strip(), parent_post_id=post_id, validate=False)
         
         return {
             "success": True,
@@ -138,17 +133,11 @@ def _agent_create_comment(
             }
         }
     except _ops.PostNotFoundError:
-        return {
-            "success": False,
-            "message": f"Post {post_id} not found",
-            "data": None
-        }
+        return _err(f"Post {post_id} not found")
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to create comment: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to create comment: {str(e)}")
 
 def _agent_create_reply(
     session: Session,
@@ -160,38 +149,21 @@ def _agent_create_reply(
     try:
         # Validate inputs
         if not content or not content.strip():
-            return {
-                "success": False,
-                "message": "Content cannot be empty",
-                "data": None
-            }
+            return _err("Content cannot be empty")
         
-        user = _ops.get_user_by_username(session, agent_username)
-        if not user:
-            return {
-                "success": False,
-                "message": f"User @{agent_username} not found",
-                "data": None
-            }
+        user = _require_user(session, agent_username)
         
         # Validate parent post exists and is not deleted
         parent_post = _ops.get_post_by_id(session, post_id)
         if not parent_post or parent_post.deleted_at:
-            return {
-                "success": False,
-                "message": f"Post {post_id} not found",
-                "data": None
-            }
+            return _err(f"Post {post_id} not found")
         
         # Validate parent is a comment or reply (has parent_post_id)
         if not parent_post.parent_post_id:
-            return {
-                "success": False,
-                "message": f"Post {post_id} is not a comment or reply, cannot reply to it",
-                "data": None
-            }
+            return _err(f"Post {post_id} is not a comment or reply, cannot reply to it")
         
-        reply = _ops.create_post(session, user.id, content.strip(), parent_post_id=post_id)
+        # User and parent already validated above; skip the re-probes
+        reply = _ops.create_post(session, user.id, content.strip(), parent_post_id=post_id, validate=False)
         
         # Get the content of the parent comment/reply
         parent_content = parent_post.content
@@ -207,17 +179,11 @@ def _agent_create_reply(
             }
         }
     except _ops.PostNotFoundError:
-        return {
-            "success": False,
-            "message": f"Post {post_id} not found",
-            "data": None
-        }
+        return _err(f"Post {post_id} not found")
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to create reply: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to create reply: {str(e)}")
 
 def agent_create_response(
     session: Session,
@@ -232,16 +198,20 @@ def agent_create_response(
     elif content_type == "reply":
         return _agent_create_reply(session, agent_username, post_id, content)
     else:
-        return {
-            "success": False,
-            "message": f"Invalid content_type: {content_type}. Use 'comment' or 'reply'",
-            "data": None
-        }
+        return _err(f"Invalid content_type: {content_type}. Use 'comment' or 'reply'")
 
 # ============================================================================
 # CONTENT VIEW
 # ============================================================================
 
+# Overview payloads keyed by the post's denormalized counters: any like,
+# unlike, or new comment changes the key, so invalidation is implicit.
+# A short TTL bounds staleness for writes the counters don't see
+# (e.g. dislikes created directly through operations).
+_OVERVIEW_TTL = 30.0
+_overview_cache: dict = {}
+_ops.register_process_cache(_overview_cache)
+
 def _agent_get_post_overview(
     session: Session,
     agent_username: str,
@@ -252,56 +222,60 @@ def _agent_get_post_overview(
         # Validate post exists and is not deleted
         post = _ops.get_post_by_id(session, post_id)
         if not post or post.deleted_at:
-            return {
-                "success": False,
-                "message": f"Post {post_id} not found",
-                "data": None
-            }
-        
-        # Get author info
-        author = _ops.get_user_by_id(session, post.user_id)
-        author_username = author.username if author else "unknown"
-        
-        # Get reaction counts
-        reaction_counts = _ops.get_reaction_counts(session, post_id)
-        like_count = reaction_counts.get("like", 0)
-        dislike_count = reaction_counts.get("dislike", 0)
-        
-        # Get all comments and replies for counting
-        all_comments = _ops.get_comments_for_post(session, post_id)
-        comment_count = len(all_comments)
-        
-        # Get top 20 comments (excluding replies) with their content
-        top_comments = []
-        for comment in all_comments[:20]:
-            if not comment.parent_post_id:  # Only top-level comments
-                comment_author = _ops.get_user_by_id(session, comment.user_id)
+            return _err(f"Post {post_id} not found")
+
+        # Version-keyed cache: repeat views of an unchanged post reuse the
+        # built payload without touching reactions or comments
+        cache_key = (
+            _ops._bind_cache_key(session), post_id,
+            post.like_count, post.comment_count
+        )
+        entry = _overview_cache.get(cache_key)
+        if entry is not None and entry[0] > time.monotonic():
+            data = entry[1]
+        else:
+            # Get reaction counts (TTL-cached; writes invalidate eagerly)
+            reaction_counts = _ops.get_reaction_counts_cached(session, post_id)
+
+            # Get top 20 comments; get_comments_for_post already returns
+            # only direct children, so no reply filtering is needed.
+            # Author usernames are denormalized onto the rows themselves
+            top_comments = []
+            for comment in _ops.get_comments_for_post(session, post_id, limit=20):
                 top_comments.append({
                     "content": comment.content,
-                    "author": comment_author.username if comment_author else "unknown",
+                    "author": comment.author_username or "unknown",
                     "created_at": comment.created_at.isoformat()
                 })
-        
-        return {
-            "success": True,
-            "message": f"Retrieved overview for post {post_id}",
-            "data": {
+
+            data = {
                 "title": post.title,
-                "author_username": author_username,
+                "author_username": post.author_username or "unknown",
                 "content": post.content,
                 "created_at": post.created_at.isoformat(),
-                "like_count": like_count,
-                "dislike_count": dislike_count,
-                "comment_count": comment_count,
+                "like_count": reaction_counts.get("like", 0),
+                "dislike_count": reaction_counts.get("dislike", 0),
+                "comment_count": post.comment_count,
                 "top_comments": top_comments
             }
-        }
-    except Exception as e:
+            if len(_overview_cache) > 4096:
+                _overview_cache.clear()
+            _overview_cache[cache_key] = (time.monotonic() + _OVERVIEW_TTL, data)
+
+        # Hand every caller a fresh copy (comment dicts included) so
+        # mutating a returned payload can't corrupt the cached one
         return {
-            "success": False,
-            "message": f"Failed to get post overview: {str(e)}",
-            "data": None
+            "success": True,
+            "message": f"Retrieved overview for post {post_id}",
+            "data": {
+                **data,
+                "top_comments": [dict(comment) for comment in data["top_comments"]]
+            }
         }
+    except _LookupError as e:
+        return e.response
+    except Exception as e:
+        return _err(f"Failed to get post overview: {str(e)}")
 
 def _agent_get_post_reactions(
     session: Session,
@@ -310,29 +284,22 @@ def _agent_get_post_reactions(
 ) -> dict:
     """Get reaction information for a post showing who liked/disliked."""
     try:
-        # Validate post exists and is not deleted
-        post = _ops.get_post_by_id(session, post_id)
+        # Validate post exists and is not deleted (narrow column probe:
+        # this view never touches content or counters)
+        post = _ops.get_post_meta(session, post_id)
         if not post or post.deleted_at:
-            return {
-                "success": False,
-                "message": f"Post {post_id} not found",
-                "data": None
-            }
-        
-        # Get all reactions for this post
-        all_reactions = _ops.get_post_reactions(session, post_id)
+            return _err(f"Post {post_id} not found")
         
-        # Separate likes and dislikes
+        # One joined query returns flat (reaction_type, username) tuples;
+        # partition them in a single pass
         like_usernames = []
         dislike_usernames = []
-        
-        for reaction in all_reactions:
-            user = _ops.get_user_by_id(session, reaction.user_id)
-            if user:
-                if reaction.reaction_type == "like":
-                    like_usernames.append(user.username)
-                elif reaction.reaction_type == "dislike":
-                    dislike_usernames.append(user.username)
+
+        for reaction_type, username in _ops.get_post_reactions_with_usernames(session, post_id):
+            if reaction_type == "like":
+                like_usernames.append(username)
+            elif reaction_type == "dislike":
+                dislike_usernames.append(username)
         
         return {
             "success": True,
@@ -343,12 +310,10 @@ def _agent_get_post_reactions(
                 "dislikes": dislike_usernames
             }
         }
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to get post reactions: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to get post reactions: {str(e)}")
 
 def _agent_get_post_comment_section(
     session: Session,
@@ -357,48 +322,33 @@ def _agent_get_post_comment_section(
 ) -> dict:
     """Get nested comment structure with replies for a post."""
     try:
-        # Validate post exists and is not deleted
-        post = _ops.get_post_by_id(session, post_id)
+        # Validate post exists and is not deleted (narrow column probe:
+        # only the title is displayed from the post itself)
+        post = _ops.get_post_meta(session, post_id)
         if not post or post.deleted_at:
-            return {
-                "success": False,
-                "message": f"Post {post_id} not found",
-                "data": None
-            }
-        
-        # Get all comments and replies
-        all_comments = _ops.get_comments_for_post(session, post_id)
+            return _err(f"Post {post_id} not found")
         
-        # Build nested structure
-        comments_by_parent = {}
+        # One recursive-CTE query returns the whole thread in path order
+        # (each comment immediately before its replies), so a single
+        # stack walk rebuilds the nesting — no intermediate dict passes
         root_comments = []
-        
-        # First pass: organize by parent
-        for comment in all_comments:
-            author = _ops.get_user_by_id(session, comment.user_id)
-            comment_data = {
-                "content": comment.content,
-                "author": author.username if author else "unknown",
-                "created_at": comment.created_at.isoformat(),
+        stack = []  # stack[d-1] is the most recent node at depth d
+        for row in _ops.get_comment_tree(session, post_id):
+            node = {
+                "content": row.content,
+                "author": row.author_username or "unknown",
+                "created_at": row.created_at.isoformat(),
                 "replies": []
             }
-            
-            if comment.parent_post_id == post_id:
-                # This is a root comment on the post
-                root_comments.append(comment_data)
-                comments_by_parent[comment.id] = comment_data
+            del stack[row.depth - 1:]
+            if stack:
+                stack[-1]["replies"].append(node)
             else:
-                # This is a reply to another comment
-                comments_by_parent[comment.id] = comment_data
-        
-        # Second pass: build reply hierarchy
-        for comment in all_comments:
-            if comment.parent_post_id != post_id:
-                # This is a reply, find its parent
-                parent_data = comments_by_parent.get(comment.parent_post_id)
-                if parent_data:
-                    comment_data = comments_by_parent[comment.id]
-                    parent_data["replies"].append(comment_data)
+                root_comments.append(node)
+            stack.append(node)
+
+        # Path order is oldest-first; top-level comments list newest first
+        root_comments.reverse()
         
         return {
             "success": True,
@@ -408,12 +358,18 @@ def _agent_get_post_comment_section(
                 "comments": root_comments
             }
         }
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to get comment section: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to get comment section: {str(e)}")
+
+# Module-level dispatch table: one dict lookup instead of chained string
+# compares on every view call
+_VIEW_DISPATCH = {
+    "overview": _agent_get_post_overview,
+    "reactions": _agent_get_post_reactions,
+    "comments": _agent_get_post_comment_section,
+}
 
 def agent_view_post(
     session: Session,
@@ -422,18 +378,10 @@ def agent_view_post(
     post_id: int
 ) -> dict:
     """Unified post viewing operations."""
-    if view_type == "overview":
-        return _agent_get_post_overview(session, agent_username, post_id)
-    elif view_type == "reactions":
-        return _agent_get_post_reactions(session, agent_username, post_id)
-    elif view_type == "comments":
-        return _agent_get_post_comment_section(session, agent_username, post_id)
-    else:
-        return {
-            "success": False,
-            "message": f"Invalid view_type: {view_type}. Use 'overview', 'reactions', or 'comments'",
-            "data": None
-        }
+    view_fn = _VIEW_DISPATCH.get(view_type)
+    if view_fn is None:
+        return _err(f"Invalid view_type: {view_type}. Use 'overview', 'reactions', or 'comments'")
+    return view_fn(session, agent_username, post_id)
 
 # ============================================================================
 # CONTENT REACT
@@ -446,42 +394,23 @@ def _agent_like_post(
 ) -> dict:
     """Like a post."""
     try:
-        agent = _ops.get_user_by_username(session, agent_username)
-        if not agent:
-            return {
-                "success": False,
-                "message": f"Agent @{agent_username} not found",
-                "data": None
-            }
+        agent = _require_user(session, agent_username, "Agent")
         
-        # Validate post exists and is not deleted
-        post = _ops.get_post_by_id(session, post_id)
+        # Validate post exists and is not deleted (narrow column probe)
+        post = _ops.get_post_meta(session, post_id)
         if not post:
-            return {
-                "success": False,
-                "message": f"Post {post_id} not found",
-                "data": None
-            }
+            return _err(f"Post {post_id} not found")
         
         if post.deleted_at is not None:
-            return {
-                "success": False,
-                "message": f"Post {post_id} has been deleted",
-                "data": None
-            }
+            return _err(f"Post {post_id} has been deleted")
         
-        if post.is_comment:
-            return {
-                "success": False,
-                "message": f"Post {post_id} is a comment, use like_comment instead",
-                "data": None
-            }
+        if post.parent_post_id is not None:
+            return _err(f"Post {post_id} is a comment, use like_comment instead")
         
         _ops.create_reaction(session, agent.id, post_id, "like")
         
-        # Get post author info
-        author = _ops.get_user_by_id(session, post.user_id)
-        author_username = author.username if author else "unknown"
+        # Author username is denormalized onto the post row
+        author_username = post.author_username or "unknown"
         
         return {
             "success": True,
@@ -493,17 +422,11 @@ def _agent_like_post(
             }
         }
     except _ops.PostNotFoundError:
-        return {
-            "success": False,
-            "message": f"Post {post_id} not found",
-            "data": None
-        }
+        return _err(f"Post {post_id} not found")
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to like post: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to like post: {str(e)}")
 
 def _agent_unlike_post(
     session: Session,
@@ -512,43 +435,24 @@ def _agent_unlike_post(
 ) -> dict:
     """Remove like from a post."""
     try:
-        agent = _ops.get_user_by_username(session, agent_username)
-        if not agent:
-            return {
-                "success": False,
-                "message": f"Agent @{agent_username} not found",
-                "data": None
-            }
+        agent = _require_user(session, agent_username, "Agent")
         
-        # Validate post exists and is not deleted
-        post = _ops.get_post_by_id(session, post_id)
+        # Validate post exists and is not deleted (narrow column probe)
+        post = _ops.get_post_meta(session, post_id)
         if not post:
-            return {
-                "success": False,
-                "message": f"Post {post_id} not found",
-                "data": None
-            }
+            return _err(f"Post {post_id} not found")
         
         if post.deleted_at is not None:
-            return {
-                "success": False,
-                "message": f"Post {post_id} has been deleted",
-                "data": None
-            }
+            return _err(f"Post {post_id} has been deleted")
         
-        if post.is_comment:
-            return {
-                "success": False,
-                "message": f"Post {post_id} is a comment, use unlike_comment instead",
-                "data": None
-            }
+        if post.parent_post_id is not None:
+            return _err(f"Post {post_id} is a comment, use unlike_comment instead")
         
         reaction = _ops.soft_delete_reaction(session, agent.id, post_id, "like")
         
         if reaction:
-            # Get post author info
-            author = _ops.get_user_by_id(session, post.user_id)
-            author_username = author.username if author else "unknown"
+            # Author username is denormalized onto the post row
+            author_username = post.author_username or "unknown"
             
             return {
                 "success": True,
@@ -560,17 +464,69 @@ def _agent_unlike_post(
                 }
             }
         else:
+            return _err(f"@{agent_username} had not liked post {post_id}")
+    except _LookupError as e:
+        return e.response
+    except Exception as e:
+        return _err(f"Failed to unlike post: {str(e)}")
+
+def like_posts_bulk(
+    session: Session,
+    likes: list
+) -> dict:
+    """
+    Apply many (username, post_id) likes in one batched statement.
+
+    Intended for simulation drivers that generate reactions in bulk:
+    usernames resolve with one IN query, posts are validated with one IN
+    query, and the reactions land as a single multi-row UPSERT with
+    grouped counter updates.
+    """
+    try:
+        if not likes:
             return {
-                "success": False,
-                "message": f"@{agent_username} had not liked post {post_id}",
-                "data": None
+                "success": True,
+                "message": "No likes to apply",
+                "data": {"applied": 0, "skipped": 0}
             }
-    except Exception as e:
+        
+        user_ids = _ops.get_user_ids_by_usernames(
+            session, list({username for username, _ in likes})
+        )
+        live_posts = set(_ops.filter_live_post_ids(
+            session, list({post_id for _, post_id in likes})
+        ))
+        
+        rows = []
+        skipped = 0
+        for username, post_id in likes:
+            user_id = user_ids.get(username)
+            if user_id is None or post_id not in live_posts:
+                skipped += 1
+                continue
+            rows.append({"user_id": user_id, "post_id": post_id})
+        
+        activated = _ops.create_reactions_bulk(session, rows, "like")
+        
         return {
-            "success": False,
-            "message": f"Failed to unlike post: {str(e)}",
-            "data": None
+            "success": True,
+            "message": f"Applied {len(activated)} likes ({skipped} skipped)",
+            "data": {"applied": len(activated), "skipped": skipped}
         }
+    except _LookupError as e:
+        return e.response
+    except Exception as e:
+        return _err(f"Failed to apply likes in bulk: {str(e)}")
+
+# Share-content template, built once at import; an optional commenter
+# note is prefixed at call time
+_SHARE_TEMPLATE = """🔄 Shared Post
+
+Original: "{title}" by @{author}
+{content}
+
+---
+Shared by @{sharer} at {time}"""
 
 def _agent_share_post(
     session: Session,
@@ -583,56 +539,29 @@ def _agent_share_post(
         # Validate post exists and is not deleted
         original_post = _ops.get_post_by_id(session, post_id)
         if not original_post or original_post.deleted_at:
-            return {
-                "success": False,
-                "message": f"Post {post_id} not found",
-                "data": None
-            }
+            return _err(f"Post {post_id} not found")
         
         # Validate that it's a post (not a comment/reply)
         if original_post.parent_post_id:
-            return {
-                "success": False,
-                "message": f"Post {post_id} is a comment or reply, cannot share it",
-                "data": None
-            }
+            return _err(f"Post {post_id} is a comment or reply, cannot share it")
         
-        # Get original author info
-        original_author = _ops.get_user_by_id(session, original_post.user_id)
-        original_author_username = original_author.username if original_author else "unknown"
+        # Original author username is denormalized onto the post row
+        original_author_username = original_post.author_username or "unknown"
         
         # Get the sharing user
-        sharing_user = _ops.get_user_by_username(session, agent_username)
-        if not sharing_user:
-            return {
-                "success": False,
-                "message": f"User @{agent_username} not found",
-                "data": None
-            }
-        
-        # Create human-readable share content
-        from datetime import datetime
-        current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
-        
-        # Build content with comment if provided
+        sharing_user = _require_user(session, agent_username)
+        
+        # Create human-readable share content from the module-level
+        # template (datetime is imported once at module scope)
+        share_content = _SHARE_TEMPLATE.format(
+            title=original_post.title,
+            author=original_author_username,
+            content=original_post.content,
+            sharer=agent_username,
+            time=datetime.now().strftime('%Y-%m-%d %H:%M')
+        )
         if comment and comment.strip():
-            share_content = f"""{comment.strip()}
-
-🔄 Shared Post
-
-Original: "{original_post.title}" by @{original_author_username}
-{original_post.content}
-
----
-Shared by @{agent_username} at {current_time}"""
-        else:
-            share_content = f"""🔄 Shared Post
-
-Original: "{original_post.title}" by @{original_author_username}
-{original_post.content}
-
----
-Shared by @{agent_username} at {current_time}"""
+            share_content = f"{comment.strip()}\n\n{share_content}"
         
         # Set title: "Shared: {original_post.title}"
         share_title = f"Shared: {original_post.title}"
@@ -652,12 +581,10 @@ Shared by @{agent_username} at {current_time}"""
                 "original_post_created_at": original_post.created_at.isoformat()
             }
         }
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to share post: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to share post: {str(e)}")
 
 def _agent_like_comment(
     session: Session,
@@ -666,42 +593,24 @@ def _agent_like_comment(
 ) -> dict:
     """Like a comment or reply."""
     try:
-        agent = _ops.get_user_by_username(session, agent_username)
-        if not agent:
-            return {
-                "success": False,
-                "message": f"Agent @{agent_username} not found",
-                "data": None
-            }
+        agent = _require_user(session, agent_username, "Agent")
         
-        # Validate post exists and is not deleted
+        # Validate comment exists and is not deleted (full fetch: the
+        # response echoes the comment's content)
         post = _ops.get_post_by_id(session, post_id)
         if not post:
-            return {
-                "success": False,
-                "message": f"Comment {post_id} not found",
-                "data": None
-            }
+            return _err(f"Comment {post_id} not found")
         
         if post.deleted_at is not None:
-            return {
-                "success": False,
-                "message": f"Comment {post_id} has been deleted",
-                "data": None
-            }
+            return _err(f"Comment {post_id} has been deleted")
         
-        if not post.is_comment:
-            return {
-                "success": False,
-                "message": f"Post {post_id} is not a comment, use like_post instead",
-                "data": None
-            }
+        if post.parent_post_id is None:
+            return _err(f"Post {post_id} is not a comment, use like_post instead")
         
         _ops.create_reaction(session, agent.id, post_id, "like")
         
-        # Get comment author info
-        author = _ops.get_user_by_id(session, post.user_id)
-        author_username = author.username if author else "unknown"
+        # Author username is denormalized onto the comment row
+        author_username = post.author_username or "unknown"
         
         return {
             "success": True,
@@ -713,17 +622,11 @@ def _agent_like_comment(
             }
         }
     except _ops.PostNotFoundError:
-        return {
-            "success": False,
-            "message": f"Comment {post_id} not found",
-            "data": None
-        }
+        return _err(f"Comment {post_id} not found")
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to like comment: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to like comment: {str(e)}")
 
 def _agent_unlike_comment(
     session: Session,
@@ -732,43 +635,25 @@ def _agent_unlike_comment(
 ) -> dict:
     """Remove like from a comment or reply."""
     try:
-        agent = _ops.get_user_by_username(session, agent_username)
-        if not agent:
-            return {
-                "success": False,
-                "message": f"Agent @{agent_username} not found",
-                "data": None
-            }
+        agent = _require_user(session, agent_username, "Agent")
         
-        # Validate post exists and is not deleted
+        # Validate comment exists and is not deleted (full fetch: the
+        # response echoes the comment's content)
         post = _ops.get_post_by_id(session, post_id)
         if not post:
-            return {
-                "success": False,
-                "message": f"Comment {post_id} not found",
-                "data": None
-            }
+            return _err(f"Comment {post_id} not found")
         
         if post.deleted_at is not None:
-            return {
-                "success": False,
-                "message": f"Comment {post_id} has been deleted",
-                "data": None
-            }
+            return _err(f"Comment {post_id} has been deleted")
         
-        if not post.is_comment:
-            return {
-                "success": False,
-                "message": f"Post {post_id} is not a comment, use unlike_post instead",
-                "data": None
-            }
+        if post.parent_post_id is None:
+            return _err(f"Post {post_id} is not a comment, use unlike_post instead")
         
         reaction = _ops.soft_delete_reaction(session, agent.id, post_id, "like")
         
         if reaction:
-            # Get comment author info
-            author = _ops.get_user_by_id(session, post.user_id)
-            author_username = author.username if author else "unknown"
+            # Author username is denormalized onto the comment row
+            author_username = post.author_username or "unknown"
             
             return {
                 "success": True,
@@ -780,17 +665,22 @@ def _agent_unlike_comment(
                 }
             }
         else:
-            return {
-                "success": False,
-                "message": f"@{agent_username} had not liked comment {post_id}",
-                "data": None
-            }
+            return _err(f"@{agent_username} had not liked comment {post_id}")
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to unlike comment: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to unlike comment: {str(e)}")
+
+_POST_REACTION_DISPATCH = {
+    "like": _agent_like_post,
+    "unlike": _agent_unlike_post,
+    "share": _agent_share_post,
+}
+
+_RESPONSE_REACTION_DISPATCH = {
+    "like": _agent_like_comment,
+    "unlike": _agent_unlike_comment,
+}
 
 def agent_react_to_post(
     session: Session,
@@ -800,24 +690,14 @@ def agent_react_to_post(
     comment: Optional[str] = None
 ) -> dict:
     """Unified post reactions: like, unlike, share."""
-    if reaction_type == "like":
-        return _agent_like_post(session, agent_username, post_id)
-    elif reaction_type == "unlike":
-        return _agent_unlike_post(session, agent_username, post_id)
-    elif reaction_type == "share":
+    react_fn = _POST_REACTION_DISPATCH.get(reaction_type)
+    if react_fn is None:
+        return _err(f"Invalid reaction_type: {reaction_type}. Use 'like', 'unlike', or 'share'")
+    if reaction_type == "share":
         if not comment:
-            return {
-                "success": False,
-                "message": f"comment is required for 'share' action",
-                "data": None
-            }
-        return _agent_share_post(session, agent_username, post_id, comment)
-    else:
-        return {
-            "success": False,
-            "message": f"Invalid reaction_type: {reaction_type}. Use 'like', 'unlike', or 'share'",
-            "data": None
-        }
+            return _err(f"comment is required for 'share' action")
+        return react_fn(session, agent_username, post_id, comment)
+    return react_fn(session, agent_username, post_id)
 
 def agent_react_to_response(
     session: Session,
@@ -826,16 +706,10 @@ def agent_react_to_response(
     post_id: int
 ) -> dict:
     """Unified comment reactions: like, unlike."""
-    if reaction_type == "like":
-        return _agent_like_comment(session, agent_username, post_id)
-    elif reaction_type == "unlike":
-        return _agent_unlike_comment(session, agent_username, post_id)
-    else:
-        return {
-            "success": False,
-            "message": f"Invalid reaction_type: {reaction_type}. Use 'like' or 'unlike'",
-            "data": None
-        }
+    react_fn = _RESPONSE_REACTION_DISPATCH.get(reaction_type)
+    if react_fn is None:
+        return _err(f"Invalid reaction_type: {reaction_type}. Use 'like' or 'unlike'")
+    return react_fn(session, agent_username, post_id)
 
 # ============================================================================
 # SOCIAL CONNECT
@@ -843,44 +717,30 @@ def agent_react_to_response(
 
 def _agent_get_user_profile(session: Session, agent_username: str, target_username: str) -> dict:
     """Get comprehensive user profile with stats and top posts."""
-    # Get target user
-    target_user = _ops.get_user_by_username(session, target_username)
+    # Get target user (memoized: profile views repeat username lookups)
+    target_user = _ops.get_user_by_username_cached(session, target_username)
     if not target_user:
-        return {
-            "success": False,
-            "message": f"User @{target_username} not found",
-            "data": None
-        }
+        return _err(f"User @{target_username} not found")
     
-    # Get basic stats
-    posts = _ops.get_posts_by_user(session, target_user.id, limit=1000, include_comments=False)
-    followers = _ops.get_followers(session, target_user.id)
-    following = _ops.get_following(session, target_user.id)
+    # Get basic stats; all three counts come from the denormalized columns
+    # the relationship/post write paths maintain, so no aggregate scan at all
+    follower_count = target_user.follower_count
+    following_count = target_user.following_count
+    post_count = target_user.post_count
     
-    # Calculate likes received and given
-    likes_received = 0
-    for post in posts:
-        reaction_counts = _ops.get_reaction_counts(session, post.id)
-        likes_received += reaction_counts.get("like", 0)
+    # Likes received: one SUM over the denormalized like_count column
+    # instead of hydrating the user's posts just to add them up
+    likes_received = _ops.sum_user_post_likes(session, target_user.id)
     
-    # Get likes given by user
-    agent_user = _ops.get_user_by_username(session, agent_username)
+    # Get likes given by user (SQL COUNT, no row hydration)
+    agent_user = _ops.get_user_by_username_cached(session, agent_username)
     likes_given = 0
     if agent_user:
-        user_reactions = _ops.get_user_reactions(session, agent_user.id)
-        likes_given = sum(1 for r in user_reactions if r.reaction_type == "like")
-    
-    # Get top 4 most liked posts (excluding comments)
-    posts_with_likes = []
-    for post in posts:
-        reaction_counts = _ops.get_reaction_counts(session, post.id)
-        like_count = reaction_counts.get("like", 0)
-        if like_count > 0 and post.title:  # Only include posts with titles and likes
-            posts_with_likes.append((post.title, like_count))
+        likes_given = _ops.count_user_reactions(session, agent_user.id, "like")
     
-    # Sort by like count and take top 4
-    posts_with_likes.sort(key=lambda x: x[1], reverse=True)
-    top_liked_posts = [title for title, _ in posts_with_likes[:4]]
+    # Get top 4 most liked posts (excluding comments): a single ORDER BY
+    # like_count DESC LIMIT 4 query instead of a Python-side selection
+    top_liked_posts = _ops.get_top_liked_post_titles(session, target_user.id, limit=4)
     
     return {
         "success": True,
@@ -889,9 +749,9 @@ def _agent_get_user_profile(session: Session, agent_username: str, target_userna
             "agent_username": agent_username,
             "target_username": target_username,
             "bio": target_user.bio or "",
-            "follower_count": len(followers),
-            "following_count": len(following),
-            "post_count": len(posts),
+            "follower_count": follower_count,
+            "following_count": following_count,
+            "post_count": post_count,
             "likes_received": likes_received,
             "likes_given": likes_given,
             "top_liked_posts": top_liked_posts
@@ -900,43 +760,29 @@ def _agent_get_user_profile(session: Session, agent_username: str, target_userna
 
 def _agent_get_user_relationship(session: Session, agent_username: str, target_username: str) -> dict:
     """Get detailed relationship information between users."""
-    # Get both users
-    agent_user = _ops.get_user_by_username(session, agent_username)
-    target_user = _ops.get_user_by_username(session, target_username)
-    
-    if not target_user:
-        return {
-            "success": False,
-            "message": f"User @{target_username} not found",
-            "data": None
-        }
-    
-    if not agent_user:
-        return {
-            "success": False,
-            "message": f"Agent user @{agent_username} not found",
-            "data": None
-        }
-    
-    # Get relationship data
-    followers = _ops.get_followers(session, target_user.id)
-    following = _ops.get_following(session, target_user.id)
-    
-    # Get friends (mutual follows)
-    friends = []
-    for follower in followers:
-        if _ops.get_relationship(session, follower.id, target_user.id, "friend"):
-            friends.append(follower.username)
-    
-    # Get agent's friends for mutual friend calculation
-    agent_followers = _ops.get_followers(session, agent_user.id)
-    agent_friends = []
-    for follower in agent_followers:
-        if _ops.get_relationship(session, follower.id, agent_user.id, "friend"):
-            agent_friends.append(follower.username)
-    
-    # Find mutual friends
-    mutual_friends = list(set(friends) & set(agent_friends))
+    # Resolve both users with one IN query; only their ids are needed here
+    user_ids = _ops.get_user_ids_by_usernames(session, [agent_username, target_username])
+    target_id = user_ids.get(target_username)
+    agent_id = user_ids.get(agent_username)
+
+    if target_id is None:
+        return _err(f"User @{target_username} not found")
+
+    if agent_id is None:
+        return _err(f"Agent user @{agent_username} not found")
+
+    # Get relationship data; only usernames are shown, so project them
+    # instead of hydrating User rows
+    followers = _ops.get_follower_usernames(session, target_id)
+    following = _ops.get_following_usernames(session, target_id)
+
+    # Friends resolve via a single self-join query instead of one
+    # relationship probe per follower; mutual friends intersect in SQL so
+    # only the overlap crosses the wire
+    friends = _ops.get_friend_usernames(session, target_id)
+    mutual_friends = _ops.get_mutual_friend_usernames(
+        session, target_id, agent_id
+    )
     
     return {
         "success": True,
@@ -944,8 +790,8 @@ def _agent_get_user_relationship(session: Session, agent_username: str, target_u
         "data": {
             "agent_username": agent_username,
             "target_username": target_username,
-            "followers": [f.username for f in followers],
-            "following": [f.username for f in following],
+            "followers": followers,
+            "following": following,
             "friends": friends,
             "mutual_friends": mutual_friends
         }
@@ -954,19 +800,13 @@ def _agent_get_user_relationship(session: Session, agent_username: str, target_u
 def _agent_get_user_posts(session: Session, agent_username: str, target_username: str) -> dict:
     """Get recent posts from a user (excluding comments)."""
     # Get target user
-    target_user = _ops.get_user_by_username(session, target_username)
+    target_user = _ops.get_user_by_username_cached(session, target_username)
     if not target_user:
-        return {
-            "success": False,
-            "message": f"User @{target_username} not found",
-            "data": None
-        }
-    
-    # Get posts (excluding comments)
-    posts = _ops.get_posts_by_user(session, target_user.id, limit=100, include_comments=False)
+        return _err(f"User @{target_username} not found")
     
-    # Extract titles, filtering out posts without titles
-    post_titles = [post.title for post in posts if post.title]
+    # Get post titles only (excluding comments); the listing never shows
+    # content bodies, so don't fetch them
+    post_titles = _ops.get_post_titles_by_user(session, target_user.id, limit=100)
     
     return {
         "success": True,
@@ -985,31 +825,23 @@ def _agent_follow_user(
 ) -> dict:
     """Create a follow relationship."""
     try:
-        agent = _ops.get_user_by_username(session, agent_username)
-        target = _ops.get_user_by_username(session, target_username)
+        # Resolve both usernames with a single IN query
+        user_ids = _ops.get_user_ids_by_usernames(
+            session, [agent_username, target_username]
+        )
+        agent_id = user_ids.get(agent_username)
+        target_id = user_ids.get(target_username)
         
-        if not agent:
-            return {
-                "success": False,
-                "message": f"Agent @{agent_username} not found",
-                "data": None
-            }
+        if agent_id is None:
+            return _err(f"Agent @{agent_username} not found")
         
-        if not target:
-            return {
-                "success": False,
-                "message": f"Target user @{target_username} not found",
-                "data": None
-            }
+        if target_id is None:
+            return _err(f"Target user @{target_username} not found")
         
-        if agent.id == target.id:
-            return {
-                "success": False,
-                "message": "Cannot follow yourself",
-                "data": None
-            }
+        if agent_id == target_id:
+            return _err("Cannot follow yourself")
         
-        _ops.create_relationship(session, agent.id, target.id, "follow")
+        _ops.create_relationship(session, agent_id, target_id, "follow")
         
         return {
             "success": True,
@@ -1020,11 +852,7 @@ def _agent_follow_user(
             }
         }
     except _ops.DuplicateError:
-        return {
-            "success": False,
-            "message": f"@{agent_username} is already following @{target_username}",
-            "data": None
-        }
+        return _err(f"@{agent_username} is already following @{target_username}")
 
 def _agent_unfollow_user(
     session: Session,
@@ -1033,17 +861,17 @@ def _agent_unfollow_user(
 ) -> dict:
     """Remove a follow relationship."""
     try:
-        agent = _ops.get_user_by_username(session, agent_username)
-        target = _ops.get_user_by_username(session, target_username)
+        # Resolve both usernames with a single IN query
+        user_ids = _ops.get_user_ids_by_usernames(
+            session, [agent_username, target_username]
+        )
+        agent_id = user_ids.get(agent_username)
+        target_id = user_ids.get(target_username)
         
-        if not agent or not target:
-            return {
-                "success": False,
-                "message": "One or both users not found",
-                "data": None
-            }
+        if agent_id is None or target_id is None:
+            return _err("One or both users not found")
         
-        relationship = _ops.soft_delete_relationship(session, agent.id, target.id, "follow")
+        relationship = _ops.soft_delete_relationship(session, agent_id, target_id, "follow")
         
         if relationship:
             return {
@@ -1055,17 +883,11 @@ def _agent_unfollow_user(
                 }
             }
         else:
-            return {
-                "success": False,
-                "message": f"@{agent_username} was not following @{target_username}",
-                "data": None
-            }
+            return _err(f"@{agent_username} was not following @{target_username}")
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to unfollow: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to unfollow: {str(e)}")
 
 def _agent_create_community(
     session: Session,
@@ -1077,36 +899,18 @@ def _agent_create_community(
     try:
         # Validate inputs
         if not name or not name.strip():
-            return {
-                "success": False,
-                "message": "Community name cannot be empty",
-                "data": None
-            }
+            return _err("Community name cannot be empty")
         
         if not description or not description.strip():
-            return {
-                "success": False,
-                "message": "Community description cannot be empty",
-                "data": None
-            }
+            return _err("Community description cannot be empty")
         
         # Check if community name already exists
         existing_community = _ops.get_community_by_name(session, name)
         if existing_community:
-            return {
-                "success": False,
-                "message": f"Community '{name}' already exists",
-                "data": None
-            }
+            return _err(f"Community '{name}' already exists")
         
         # Get agent
-        agent = _ops.get_user_by_username(session, agent_username)
-        if not agent:
-            return {
-                "success": False,
-                "message": f"Agent @{agent_username} not found",
-                "data": None
-            }
+        agent = _require_user(session, agent_username, "Agent")
         
         # Create community
         community = _ops.create_community(session, name, agent.id, description)
@@ -1124,12 +928,10 @@ def _agent_create_community(
                 "created_at": community.created_at.isoformat()
             }
         }
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to create community: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to create community: {str(e)}")
 
 def _agent_join_community(
     session: Session,
@@ -1139,38 +941,20 @@ def _agent_join_community(
     """Join a community."""
     try:
         # Get agent
-        agent = _ops.get_user_by_username(session, agent_username)
-        if not agent:
-            return {
-                "success": False,
-                "message": f"Agent @{agent_username} not found",
-                "data": None
-            }
+        agent = _require_user(session, agent_username, "Agent")
         
         # Get community
         community = _ops.get_community_by_name(session, community_name)
         if not community:
-            return {
-                "success": False,
-                "message": f"Community '{community_name}' not found",
-                "data": None
-            }
+            return _err(f"Community '{community_name}' not found")
         
         if community.deleted_at is not None:
-            return {
-                "success": False,
-                "message": f"Community '{community_name}' has been deleted",
-                "data": None
-            }
+            return _err(f"Community '{community_name}' has been deleted")
         
         # Check if already a member
         existing_membership = _ops.get_membership(session, agent.id, community.id)
         if existing_membership:
-            return {
-                "success": False,
-                "message": f"@{agent_username} is already a member of '{community_name}'",
-                "data": None
-            }
+            return _err(f"@{agent_username} is already a member of '{community_name}'")
         
         # Join community
         _ops.create_membership(session, agent.id, community.id, "member")
@@ -1183,12 +967,10 @@ def _agent_join_community(
                 "community_name": community_name
             }
         }
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to join community: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to join community: {str(e)}")
 
 def _agent_leave_community(
     session: Session,
@@ -1198,46 +980,24 @@ def _agent_leave_community(
     """Leave a community."""
     try:
         # Get agent
-        agent = _ops.get_user_by_username(session, agent_username)
-        if not agent:
-            return {
-                "success": False,
-                "message": f"Agent @{agent_username} not found",
-                "data": None
-            }
+        agent = _require_user(session, agent_username, "Agent")
         
         # Get community
         community = _ops.get_community_by_name(session, community_name)
         if not community:
-            return {
-                "success": False,
-                "message": f"Community '{community_name}' not found",
-                "data": None
-            }
+            return _err(f"Community '{community_name}' not found")
         
         if community.deleted_at is not None:
-            return {
-                "success": False,
-                "message": f"Community '{community_name}' has been deleted",
-                "data": None
-            }
+            return _err(f"Community '{community_name}' has been deleted")
         
         # Check if creator (cannot leave own community)
         if community.created_by == agent.id:
-            return {
-                "success": False,
-                "message": f"@{agent_username} is the creator of '{community_name}' and cannot leave",
-                "data": None
-            }
+            return _err(f"@{agent_username} is the creator of '{community_name}' and cannot leave")
         
         # Check membership
         membership = _ops.get_membership(session, agent.id, community.id)
         if not membership:
-            return {
-                "success": False,
-                "message": f"@{agent_username} is not a member of '{community_name}'",
-                "data": None
-            }
+            return _err(f"@{agent_username} is not a member of '{community_name}'")
         
         # Leave community (soft delete membership)
         from datetime import datetime, timezone
@@ -1252,12 +1012,10 @@ def _agent_leave_community(
                 "community_name": community_name
             }
         }
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to leave community: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to leave community: {str(e)}")
 
 def _agent_get_community_infos(
     session: Session,
@@ -1267,45 +1025,29 @@ def _agent_get_community_infos(
     """Get community information with top members."""
     try:
         # Get agent
-        agent = _ops.get_user_by_username(session, agent_username)
-        if not agent:
-            return {
-                "success": False,
-                "message": f"Agent @{agent_username} not found",
-                "data": None
-            }
+        agent = _require_user(session, agent_username, "Agent")
         
         # Get community
         community = _ops.get_community_by_name(session, community_name)
         if not community:
-            return {
-                "success": False,
-                "message": f"Community '{community_name}' not found",
-                "data": None
-            }
+            return _err(f"Community '{community_name}' not found")
         
         if community.deleted_at is not None:
-            return {
-                "success": False,
-                "message": f"Community '{community_name}' has been deleted",
-                "data": None
-            }
-        
-        # Get creator info
-        creator = _ops.get_user_by_id(session, community.created_by)
-        creator_username = creator.username if creator else "unknown"
-        
-        # Get all members
-        members = _ops.get_community_members(session, community.id)
-        
-        # Get top 4 members (excluding creator, sorted by join date)
-        top_members = []
-        for member in members[:4]:  # First 4 members
-            if member.id != community.created_by:  # Exclude creator
-                top_members.append({
-                    "username": member.username,
-                    "bio": member.bio or ""
-                })
+            return _err(f"Community '{community_name}' has been deleted")
+        
+        # Creator was eager-loaded with the community; keep the live check
+        # get_user_by_id used to apply
+        creator = community.creator
+        creator_username = creator.username if creator and creator.deleted_at is None else "unknown"
+        
+        # Top 4 members by join date, creator excluded and LIMIT applied
+        # in SQL — the full member list is never materialized here
+        top_members = [
+            {"username": username, "bio": bio or ""}
+            for username, bio in _ops.get_community_top_members(
+                session, community.id, exclude_user_id=community.created_by
+            )
+        ]
         
         return {
             "success": True,
@@ -1318,12 +1060,10 @@ def _agent_get_community_infos(
                 "top_members": top_members
             }
         }
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to get community info: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to get community info: {str(e)}")
 
 def _agent_get_community_members(
     session: Session,
@@ -1333,33 +1073,20 @@ def _agent_get_community_members(
     """Get all community members."""
     try:
         # Get agent
-        agent = _ops.get_user_by_username(session, agent_username)
-        if not agent:
-            return {
-                "success": False,
-                "message": f"Agent @{agent_username} not found",
-                "data": None
-            }
+        agent = _require_user(session, agent_username, "Agent")
         
         # Get community
         community = _ops.get_community_by_name(session, community_name)
         if not community:
-            return {
-                "success": False,
-                "message": f"Community '{community_name}' not found",
-                "data": None
-            }
+            return _err(f"Community '{community_name}' not found")
         
         if community.deleted_at is not None:
-            return {
-                "success": False,
-                "message": f"Community '{community_name}' has been deleted",
-                "data": None
-            }
+            return _err(f"Community '{community_name}' has been deleted")
         
-        # Get creator info
-        creator = _ops.get_user_by_id(session, community.created_by)
-        creator_username = creator.username if creator else "unknown"
+        # Creator was eager-loaded with the community; keep the live check
+        # get_user_by_id used to apply
+        creator = community.creator
+        creator_username = creator.username if creator and creator.deleted_at is None else "unknown"
         
         # Get all members
         members = _ops.get_community_members(session, community.id)
@@ -1382,12 +1109,18 @@ def _agent_get_community_members(
                 "members": member_list
             }
         }
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to get community members: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to get community members: {str(e)}")
+
+_USER_ACTION_DISPATCH = {
+    "get_profile": _agent_get_user_profile,
+    "get_relationship": _agent_get_user_relationship,
+    "get_posts": _agent_get_user_posts,
+    "follow": _agent_follow_user,
+    "unfollow": _agent_unfollow_user,
+}
 
 def agent_connect_with_user(
     session: Session,
@@ -1396,29 +1129,19 @@ def agent_connect_with_user(
     target_username: str
 ) -> dict:
     """Unified user operations: get_profile, get_relationship, get_posts, follow, unfollow."""
-    if not target_username and action_type in ["get_profile", "get_relationship", "get_posts", "follow", "unfollow"]:
-        return {
-            "success": False,
-            "message": f"target_username is required for action_type '{action_type}'",
-            "data": None
-        }
-    
-    if action_type == "get_profile":
-        return _agent_get_user_profile(session, agent_username, target_username)
-    elif action_type == "get_relationship":
-        return _agent_get_user_relationship(session, agent_username, target_username)
-    elif action_type == "get_posts":
-        return _agent_get_user_posts(session, agent_username, target_username)
-    elif action_type == "follow":
-        return _agent_follow_user(session, agent_username, target_username)
-    elif action_type == "unfollow":
-        return _agent_unfollow_user(session, agent_username, target_username)
-    else:
-        return {
-            "success": False,
-            "message": f"Invalid action_type: {action_type}. Use 'profile', 'relationship', 'posts', 'follow', or 'unfollow'",
-            "data": None
-        }
+    action_fn = _USER_ACTION_DISPATCH.get(action_type)
+    if action_fn is None:
+        return _err(f"Invalid action_type: {action_type}. Use 'get_profile', 'get_relationship', 'get_posts', 'follow', or 'unfollow'")
+    if not target_username:
+        return _err(f"target_username is required for action_type '{action_type}'")
+    return action_fn(session, agent_username, target_username)
+
+_COMMUNITY_ACTION_DISPATCH = {
+    "join": _agent_join_community,
+    "leave": _agent_leave_community,
+    "get_info": _agent_get_community_infos,
+    "get_members": _agent_get_community_members,
+}
 
 def agent_manage_community(
     session: Session,
@@ -1430,34 +1153,14 @@ def agent_manage_community(
     """Unified community operations: create, join, leave, get_info, get_members."""
     if action_type == "create":
         if not community_name or not description:
-            return {
-                "success": False,
-                "message": "community_name and description are required for 'create' action",
-                "data": None
-            }
+            return _err("community_name and description are required for 'create' action")
         return _agent_create_community(session, agent_username, community_name, description)
-    elif action_type in ["join", "leave", "get_info", "get_members"]:
-        if not community_name:
-            return {
-                "success": False,
-                "message": f"community_name is required for action_type '{action_type}'",
-                "data": None
-            }
-        
-        if action_type == "join":
-            return _agent_join_community(session, agent_username, community_name)
-        elif action_type == "leave":
-            return _agent_leave_community(session, agent_username, community_name)
-        elif action_type == "get_info":
-            return _agent_get_community_infos(session, agent_username, community_name)
-        elif action_type == "get_members":
-            return _agent_get_community_members(session, agent_username, community_name)
-    else:
-        return {
-            "success": False,
-            "message": f"Invalid action_type: {action_type}. Use 'create', 'join', 'leave', 'info', or 'members'",
-            "data": None
-        }
+    action_fn = _COMMUNITY_ACTION_DISPATCH.get(action_type)
+    if action_fn is None:
+        return _err(f"Invalid action_type: {action_type}. Use 'create', 'join', 'leave', 'get_info', or 'get_members'")
+    if not community_name:
+        return _err(f"community_name is required for action_type '{action_type}'")
+    return action_fn(session, agent_username, community_name)
 
 # ============================================================================
 # CONTENT DISCOVERY
@@ -1476,17 +1179,12 @@ def _agent_get_feed(
     """
     try:
         # Get agent
-        agent = _ops.get_user_by_username(session, agent_username)
-        if not agent:
-            return {
-                "success": False,
-                "message": f"Agent @{agent_username} not found",
-                "data": None
-            }
+        agent = _require_user(session, agent_username, "Agent")
         
         # Get users this agent follows
-        following = _ops.get_following(session, agent.id)
-        following_ids = [u.id for u in following]
+        # Follow edges come from the in-process adjacency cache, which the
+        # relationship write paths keep current
+        following_ids = _ops.get_following_ids(session, agent.id)
         
         # Include agent's own posts
         following_ids.append(agent.id)
@@ -1495,45 +1193,33 @@ def _agent_get_feed(
         agent_communities = _ops.get_user_communities(session, agent.id)
         community_ids = [c.id for c in agent_communities]
         
-        # Get posts from followed users (excluding comments)
-        feed_posts = []
-        for user_id in following_ids:
-            user_posts = _ops.get_posts_by_user(session, user_id, limit=50, include_comments=False)
-            feed_posts.extend(user_posts)
-        
-        # Get posts from agent's communities (excluding comments)
-        for community_id in community_ids:
-            community_members = _ops.get_community_members(session, community_id)
-            for member in community_members:
-                member_posts = _ops.get_posts_by_user(session, member.id, limit=10, include_comments=False)
-                feed_posts.extend(member_posts)
-        
-        # Remove duplicates and sort by creation time (newest first)
-        seen_posts = set()
-        unique_posts = []
-        for post in feed_posts:
-            if post.id not in seen_posts:
-                seen_posts.add(post.id)
-                unique_posts.append(post)
-        
-        unique_posts.sort(key=lambda p: p.created_at, reverse=True)
-        
-        # Format posts for feed
-        feed_items = []
-        for post in unique_posts[:limit]:
-            author = _ops.get_user_by_id(session, post.user_id)
-            reaction_counts = _ops.get_reaction_counts(session, post.id)
-            comments = _ops.get_comments_for_post(session, post.id)
-            
-            feed_items.append({
-                "id": post.id,
-                "title": post.title,
-                "author_username": author.username if author else "unknown",
-                "content": post.content,
-                "created_at": post.created_at.isoformat(),
-                "like_count": reaction_counts.get("like", 0),
-                "comment_count": len(comments)
-            })
+        # Candidate authors: followed users plus community members not already followed
+        followed_set = frozenset(following_ids)
+        member_ids = [
+            member_id
+            for member_id in _ops.get_community_member_ids(session, community_ids)
+            if member_id not in followed_set
+        ]
+
+        # Single projected query: SQLite sorts and limits using the
+        # (user_id, created_at) index, the author join replaces a second
+        # lookup, and plain Row tuples skip ORM instrumentation
+        rows = _ops.get_feed_post_rows(
+            session, following_ids + member_ids, limit=limit
+        )
+
+        feed_items = [
+            {
+                "id": row.id,
+                "title": row.title,
+                "author_username": row.username,
+                "content": row.content,
+                "created_at": row.created_at.isoformat(),
+                "like_count": row.like_count,
+                "comment_count": row.comment_count
+            }
+            for row in rows
+        ]
         
         return {
             "success": True,
@@ -1543,12 +1229,18 @@ def _agent_get_feed(
                 "feed_items": feed_items
             }
         }
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to get feed: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to get feed: {str(e)}")
+
+# Trending is global and coarse by nature: every agent sees the same
+# ranking, so a page computed within the last few seconds is as good as
+# a fresh one. Keyed by (bind cache key, limit) so databases never mix,
+# in-memory ones included.
+_TRENDING_TTL = 30.0
+_trending_cache: dict = {}
+_ops.register_process_cache(_trending_cache)
 
 def _agent_get_trending(
     session: Session,
@@ -1559,75 +1251,78 @@ def _agent_get_trending(
     Get trending posts globally.
     
     Simple MVP trending: posts from last 7 days with most likes,
-    sorted by like count (highest first).
+    sorted by like count (highest first). Results are served from a
+    short-lived in-process cache shared across agents.
     """
     try:
         # Get agent
-        agent = _ops.get_user_by_username(session, agent_username)
-        if not agent:
+        agent = _require_user(session, agent_username, "Agent")
+        
+        cache_key = (_ops._bind_cache_key(session), limit)
+        entry = _trending_cache.get(cache_key)
+        if entry is not None and entry[0] > time.monotonic():
+            # Copy each post dict, not just the list, so callers can't
+            # mutate the cached rows
             return {
-                "success": False,
-                "message": f"Agent @{agent_username} not found",
-                "data": None
+                "success": True,
+                "message": f"Retrieved trending posts for @{agent_username}",
+                "data": {
+                    "agent_username": agent_username,
+                    "trending_posts": [dict(item) for item in entry[1]]
+                }
             }
         
-        from sqlalchemy import func, desc, and_
+        from sqlalchemy import desc, and_
         from datetime import timedelta
-        from .models import Post, Reaction
+        from .models import Post, User
         
-        # Get posts from last 7 days with like counts
+        # Get posts from last 7 days ranked by like count. The aggregate
+        # is effectively materialized: the reaction write paths maintain
+        # Post.like_count incrementally, so ranking is a plain indexed
+        # ORDER BY instead of re-joining and grouping reactions per call.
         recent_cutoff = datetime.now() - timedelta(days=7)
         
         trending_query = session.query(
             Post,
-            func.count(Reaction.id).label('like_count')
-        ).outerjoin(
-            Reaction,
-            and_(
-                Reaction.post_id == Post.id,
-                Reaction.reaction_type == 'like',
-                Reaction.deleted_at.is_(None)
-            )
+            User.username
+        ).join(
+            User, User.id == Post.user_id
         ).filter(
             and_(
                 Post.created_at >= recent_cutoff,
                 Post.deleted_at.is_(None),
                 Post.parent_post_id.is_(None)  # Only top-level posts
             )
-        ).group_by(Post.id).order_by(desc('like_count')).limit(limit)
+        ).order_by(desc(Post.like_count)).limit(limit)
         
         trending_posts = []
-        for post, like_count in trending_query.all():
-            # Get author info
-            author = _ops.get_user_by_id(session, post.user_id)
-            
-            # Get comment count
-            comments = _ops.get_comments_for_post(session, post.id)
-            
+        for post, author_username in trending_query.all():
             trending_posts.append({
                 "id": post.id,
                 "title": post.title,
-                "author_username": author.username if author else "unknown",
+                "author_username": author_username,
                 "content": post.content,
                 "created_at": post.created_at.isoformat(),
-                "like_count": like_count,
-                "comment_count": len(comments)
+                "like_count": post.like_count,
+                "comment_count": post.comment_count
             })
         
+        if len(_trending_cache) > 64:
+            _trending_cache.clear()
+        _trending_cache[cache_key] = (time.monotonic() + _TRENDING_TTL, trending_posts)
+
         return {
             "success": True,
             "message": f"Retrieved trending posts for @{agent_username}",
             "data": {
                 "agent_username": agent_username,
-                "trending_posts": trending_posts
+                "trending_posts": [dict(item) for item in trending_posts]
             }
         }
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to get trending posts: {str(e)}",
-            "data": None
-        }
+        return _err(f"Failed to get trending posts: {str(e)}")
 
 def agent_get_discovery(
     session: Session,
@@ -1641,11 +1336,7 @@ def agent_get_discovery(
     elif discovery_type == "trending":
         return _agent_get_trending(session, agent_username, limit)
     else:
-        return {
-            "success": False,
-            "message": f"Invalid discovery_type: {discovery_type}. Use 'feed' or 'trending'",
-            "data": None
-        }
+        return _err(f"Invalid discovery_type: {discovery_type}. Use 'feed' or 'trending'")
 
 def agent_search(
     session: Session,
@@ -1660,20 +1351,10 @@ def agent_search(
     try:
         # Validate inputs
         if not query or not query.strip():
-            return {
-                "success": False,
-                "message": "Search query cannot be empty",
-                "data": None
-            }
+            return _err("Search query cannot be empty")
         
         # Validate agent exists
-        agent = _ops.get_user_by_username(session, agent_username)
-        if not agent:
-            return {
-                "success": False,
-                "message": f"Agent @{agent_username} not found",
-                "data": None
-            }
+        agent = _require_user(session, agent_username, "Agent")
         
         query_lower = query.lower().strip()
         results = {"posts": [], "users": [], "communities": []}
@@ -1746,10 +1427,8 @@ def agent_search(
             }
         }
     
+    except _LookupError as e:
+        return e.response
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"Search failed: {str(e)}",
-            "data": None
-        }
+        return _err(f"Search failed: {str(e)}")
 
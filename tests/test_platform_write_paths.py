@@ -0,0 +1,324 @@
+"""
+Tests for the platform write paths and process-level caches.
+
+Covers the bulk APIs, the UPSERT revive flows (unfollow→refollow,
+unlike→relike), denormalized counter consistency, and cache hygiene
+(copy-on-return, rollback healing, reset clearing).
+"""
+
+import sys
+from pathlib import Path
+
+# Add the agora directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agora.platform import DatabaseManager, services
+from agora.platform import operations as ops
+from agora.platform.models import User, Post, Reaction, Relationship
+
+
+def _make_post(session, username, title, content="content"):
+    """Create a post and return its id."""
+    result = services.agent_create_post(session, username, title, content)
+    assert result["success"], result["message"]
+    return ops.get_post_by_title(session, title).id
+
+
+# ============================================================================
+# BULK PATHS
+# ============================================================================
+
+def test_create_users_bulk(temp_db):
+    """create_users_bulk inserts in chunks and returns ids in input order."""
+    records = [{"username": f"agent_{i}", "bio": f"bio {i}"} for i in range(7)]
+    with temp_db.get_session() as session:
+        user_ids = ops.create_users_bulk(session, records, chunk=3)
+        assert len(user_ids) == 7
+        # Ids map back to the right usernames, in input order
+        for record, user_id in zip(records, user_ids):
+            assert ops.get_user_by_id(session, user_id).username == record["username"]
+
+
+def test_batch_session_add_many_chunked(temp_db):
+    """add_many with a chunk_size lands every row across chunk commits."""
+    with temp_db.batch_operation(chunk_size=2) as session:
+        session.add_many(
+            User,
+            [{"username": f"bulk_{i}", "bio": None} for i in range(5)]
+        )
+    with temp_db.get_session() as session:
+        count = session.query(User).filter(
+            User.username.like("bulk_%")
+        ).count()
+        assert count == 5
+
+
+def test_like_posts_bulk(temp_db, sample_users):
+    """like_posts_bulk applies valid likes, skips bad ones, updates counters."""
+    with temp_db.get_session() as session:
+        post_id = _make_post(session, "alice", "Bulk Target")
+        result = services.like_posts_bulk(session, [
+            ("bob", post_id),
+            ("charlie", post_id),
+            ("nobody", post_id),     # unknown user
+            ("bob", post_id + 999),  # unknown post
+        ])
+        assert result["success"]
+        assert result["data"] == {"applied": 2, "skipped": 2}
+
+    with temp_db.get_session() as session:
+        post = ops.get_post_by_id(session, post_id)
+        live_likes = session.query(Reaction).filter(
+            Reaction.post_id == post_id,
+            Reaction.reaction_type == "like",
+            Reaction.deleted_at.is_(None)
+        ).count()
+        assert post.like_count == live_likes == 2
+
+
+# ============================================================================
+# UPSERT REVIVE FLOWS
+# ============================================================================
+
+def test_unfollow_then_refollow_revives_edge(temp_db, sample_users):
+    """Refollowing after an unfollow revives the soft-deleted edge."""
+    with temp_db.get_session() as session:
+        assert services.agent_connect_with_user(
+            session, "alice", "follow", "bob")["success"]
+        # Duplicate follow on an active edge is rejected
+        assert not services.agent_connect_with_user(
+            session, "alice", "follow", "bob")["success"]
+        assert services.agent_connect_with_user(
+            session, "alice", "unfollow", "bob")["success"]
+        assert services.agent_connect_with_user(
+            session, "alice", "follow", "bob")["success"]
+
+    with temp_db.get_session() as session:
+        # One physical row, revived rather than duplicated
+        rows = session.query(Relationship).filter(
+            Relationship.relationship_type == "follow"
+        ).all()
+        assert len(rows) == 1
+        assert rows[0].deleted_at is None
+        # Counters went 1 → 0 → 1, not 2
+        alice = ops.get_user_by_username(session, "alice")
+        bob = ops.get_user_by_username(session, "bob")
+        assert alice.following_count == 1
+        assert bob.follower_count == 1
+
+
+def test_unlike_then_relike_revives_reaction(temp_db, sample_users):
+    """Reliking after an unlike revives the soft-deleted reaction."""
+    with temp_db.get_session() as session:
+        post_id = _make_post(session, "alice", "Relike Target")
+        assert services.agent_react_to_post(
+            session, "bob", "like", post_id)["success"]
+        assert services.agent_react_to_post(
+            session, "bob", "unlike", post_id)["success"]
+        assert services.agent_react_to_post(
+            session, "bob", "like", post_id)["success"]
+
+    with temp_db.get_session() as session:
+        rows = session.query(Reaction).filter(
+            Reaction.post_id == post_id
+        ).all()
+        assert len(rows) == 1
+        assert rows[0].deleted_at is None
+        assert ops.get_post_by_id(session, post_id).like_count == 1
+
+
+# ============================================================================
+# DENORMALIZED COUNTER CONSISTENCY
+# ============================================================================
+
+def test_counters_match_actual_rows(temp_db, sample_users):
+    """Denormalized counters stay equal to the live rows they summarize."""
+    with temp_db.get_session() as session:
+        post_id = _make_post(session, "alice", "Counter Post")
+        _make_post(session, "alice", "Second Post")
+        services.agent_create_response(
+            session, "bob", "comment", post_id, "First!")
+        services.agent_create_response(
+            session, "charlie", "comment", post_id, "Second!")
+        services.agent_react_to_post(session, "bob", "like", post_id)
+        services.agent_connect_with_user(session, "bob", "follow", "alice")
+        services.agent_connect_with_user(session, "charlie", "follow", "alice")
+
+    with temp_db.get_session() as session:
+        alice = ops.get_user_by_username(session, "alice")
+        post = ops.get_post_by_id(session, post_id)
+
+        live_followers = session.query(Relationship).filter(
+            Relationship.followed_id == alice.id,
+            Relationship.relationship_type == "follow",
+            Relationship.deleted_at.is_(None)
+        ).count()
+        live_posts = session.query(Post).filter(
+            Post.user_id == alice.id,
+            Post.parent_post_id.is_(None),
+            Post.deleted_at.is_(None)
+        ).count()
+        live_comments = session.query(Post).filter(
+            Post.parent_post_id == post_id,
+            Post.deleted_at.is_(None)
+        ).count()
+        live_likes = session.query(Reaction).filter(
+            Reaction.post_id == post_id,
+            Reaction.reaction_type == "like",
+            Reaction.deleted_at.is_(None)
+        ).count()
+
+        assert alice.follower_count == live_followers == 2
+        assert alice.post_count == live_posts == 2
+        assert post.comment_count == live_comments == 2
+        assert post.like_count == live_likes == 1
+
+
+# ============================================================================
+# PROCESS-LEVEL CACHE HYGIENE
+# ============================================================================
+
+def test_feed_excludes_soft_deleted_authors(temp_db, sample_users):
+    """Soft-deleting an author drops them from adjacency and feed rows."""
+    with temp_db.get_session() as session:
+        services.agent_connect_with_user(session, "alice", "follow", "bob")
+        _make_post(session, "bob", "Bob Post")
+        bob_id = ops.get_user_by_username(session, "bob").id
+        ops.soft_delete_user(session, bob_id)
+
+    with temp_db.get_session() as session:
+        alice = ops.get_user_by_username(session, "alice")
+        assert bob_id not in ops.get_following_ids(session, alice.id)
+        feed = services.agent_get_discovery(session, "alice", "feed")
+        titles = [p["title"] for p in feed["data"]["feed_items"]]
+        assert "Bob Post" not in titles
+
+
+def test_following_cache_rollback_heals_on_expiry(temp_db, sample_users):
+    """A rolled-back follow can't outlive the adjacency cache TTL."""
+    with temp_db.get_session() as session:
+        alice = ops.get_user_by_username(session, "alice")
+        bob = ops.get_user_by_username(session, "bob")
+        alice_id, bob_id = alice.id, bob.id
+        # Warm the cache with the true (empty) adjacency
+        assert ops.get_following_ids(session, alice_id) == []
+
+    # Follow, then roll back: the eager cache adjustment is now wrong
+    session = temp_db.session_factory()
+    try:
+        ops.create_relationship(session, alice_id, bob_id, "follow")
+        session.rollback()
+    finally:
+        session.close()
+
+    with temp_db.get_session() as session:
+        key = (ops._bind_cache_key(session), alice_id)
+        entry = ops._following_ids_cache.get(key)
+        # The stale entry carries a TTL; force it to lapse and the next
+        # read must requery instead of serving the phantom edge
+        if entry is not None:
+            ops._following_ids_cache[key] = (0.0, entry[1])
+        assert ops.get_following_ids(session, alice_id) == []
+
+
+def test_reset_database_clears_process_caches(temp_db, sample_users):
+    """reset_database drops every registered process-level cache."""
+    with temp_db.get_session() as session:
+        post_id = _make_post(session, "alice", "Cached Post")
+        alice = ops.get_user_by_username(session, "alice")
+        # Warm several caches
+        ops.get_following_ids(session, alice.id)
+        services.agent_view_post(session, "alice", "overview", post_id)
+        services.agent_get_discovery(session, "alice", "trending")
+
+    temp_db.reset_database()
+
+    assert ops._following_ids_cache == {}
+    assert ops._reaction_counts_cache == {}
+    assert services._overview_cache == {}
+    assert services._trending_cache == {}
+
+
+def test_overview_cache_returns_fresh_copies(temp_db, sample_users):
+    """Mutating a returned overview payload can't corrupt the cache."""
+    with temp_db.get_session() as session:
+        post_id = _make_post(session, "alice", "Overview Post")
+        services.agent_create_response(
+            session, "bob", "comment", post_id, "Nice post")
+
+        first = services.agent_view_post(session, "alice", "overview", post_id)
+        first["data"]["title"] = "MANGLED"
+        first["data"]["top_comments"][0]["content"] = "MANGLED"
+
+        second = services.agent_view_post(session, "alice", "overview", post_id)
+        assert second["data"]["title"] == "Overview Post"
+        assert second["data"]["top_comments"][0]["content"] == "Nice post"
+
+
+def test_trending_cache_returns_fresh_copies(temp_db, sample_users):
+    """Mutating a returned trending list can't corrupt the cache."""
+    with temp_db.get_session() as session:
+        post_id = _make_post(session, "alice", "Trending Post")
+        services.agent_react_to_post(session, "bob", "like", post_id)
+
+        first = services.agent_get_discovery(session, "alice", "trending")
+        first["data"]["trending_posts"][0]["title"] = "MANGLED"
+
+        second = services.agent_get_discovery(session, "bob", "trending")
+        assert second["data"]["trending_posts"][0]["title"] == "Trending Post"
+
+
+def test_caches_isolate_in_memory_databases():
+    """Two in-memory databases never see each other's cached payloads.
+
+    Every in-memory engine shares the URL sqlite:///:memory:, and fresh
+    databases reuse the same small post ids and counter values, so any
+    cache keyed on the raw bind URL would collide here.
+    """
+    db1 = DatabaseManager(":memory:")
+    db1.initialize_database()
+    db2 = DatabaseManager(":memory:")
+    db2.initialize_database()
+    try:
+        with db1.get_session() as session:
+            services.create_user_account(session, "alice", "bio")
+            services.create_user_account(session, "bob", "bio")
+            post_id = _make_post(session, "alice", "DB1 Post")
+            services.agent_react_to_post(session, "bob", "like", post_id)
+            # Warm every cache with DB1's data
+            ops.get_reaction_counts_cached(session, post_id)
+            services.agent_view_post(session, "alice", "overview", post_id)
+            services.agent_get_discovery(session, "alice", "trending")
+
+        with db2.get_session() as session:
+            services.create_user_account(session, "carol", "bio")
+            other_id = _make_post(session, "carol", "DB2 Post")
+            # Same post id as DB1: the collision precondition
+            assert other_id == post_id
+
+            assert ops.get_reaction_counts_cached(session, other_id) == {}
+            overview = services.agent_view_post(
+                session, "carol", "overview", other_id)
+            assert overview["data"]["title"] == "DB2 Post"
+            assert overview["data"]["author_username"] == "carol"
+            trending = services.agent_get_discovery(
+                session, "carol", "trending")
+            titles = [p["title"] for p in trending["data"]["trending_posts"]]
+            assert "DB1 Post" not in titles
+    finally:
+        db1.close()
+        db2.close()
+
+
+def test_update_user_refreshes_post_author_username(temp_db, sample_users):
+    """Renaming a user rewrites author_username on their posts."""
+    with temp_db.get_session() as session:
+        post_id = _make_post(session, "alice", "Rename Post")
+        alice = ops.get_user_by_username(session, "alice")
+        ops.update_user(session, alice.id, username="alice_renamed")
+
+    with temp_db.get_session() as session:
+        assert ops.get_post_by_id(session, post_id).author_username == "alice_renamed"
+        overview = services.agent_view_post(
+            session, "alice_renamed", "overview", post_id)
+        assert overview["data"]["author_username"] == "alice_renamed"